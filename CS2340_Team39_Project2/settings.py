@@ -14,14 +14,12 @@ import sys
 from pathlib import Path
 
 
-import certifi
-import django_heroku
+import dj_database_url
 from decouple import config
-from django.contrib import staticfiles
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
-SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
+SECRET_KEY = os.getenv('SECRET_KEY', os.getenv('DJANGO_SECRET_KEY'))
 DEBUG = True
 
 # Quick-start development settings - unsuitable for production
@@ -34,11 +32,11 @@ load_dotenv()
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
 OPENAI_KEY_SECRET = os.getenv('OPENAI_KEY')
-ALLOWED_HOSTS = [
-    'localhost',
-    '127.0.0.1',
-    'cs2340-group39-spotifywrapped-487f1de3fd57.herokuapp.com'
-]
+# Any host is accepted, as django-heroku configured before it was removed;
+# Heroku's router only forwards requests for the app's own domains
+ALLOWED_HOSTS = ['*']
+# Heroku terminates TLS at its router and forwards the original scheme
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 
 LOCALE_PATHS = [
@@ -59,7 +57,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'spotify_wrapped.routers.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +82,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'spotify_wrapped.context_processors.spotify_username',
+                'spotify_wrapped.context_processors.theme_chrome',
             ],
         },
     },
@@ -101,25 +103,85 @@ WSGI_APPLICATION = 'CS2340_Team39_Project2.wsgi.application'
 # }
 # Database configuration
 if 'test' in sys.argv or 'pytest' in sys.modules:
-    # Use SQLite for tests
+    # Use SQLite for tests; the second database stands in for a read replica
+    # in the router tests
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': ':memory:',
-        }
+        },
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
     }
+    DATABASE_REPLICA_ALIAS = None
 else:
-    # Use PostgreSQL in production
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql_psycopg2',
-            'NAME': 'dflv8lm2kb322k',
-            'USER': 'uamnb8ffd1ghc3',
-            'PASSWORD': 'p5c30663591a8c49b718272440a7b744b818a432b1f1e0f3f52c28a975e573eef',
-            'HOST': 'c8m0261h0c7idk.cluster-czrs8kj4isg7.us-east-1.rds.amazonaws.com',
-            'PORT': '5432',
+    # Use PostgreSQL, configured from the environment. Heroku's DATABASE_URL
+    # takes precedence over the individual DB_* variables. There are no
+    # defaults: a missing variable raises at start-up instead of silently
+    # connecting somewhere else.
+    if 'DATABASE_URL' in os.environ:
+        DATABASES = {'default': dj_database_url.parse(os.environ['DATABASE_URL'], ssl_require=True)}
+    else:
+        DATABASES = {
+            'default': {
+                'ENGINE': 'django.db.backends.postgresql',
+                'NAME': config('DB_NAME'),
+                'USER': config('DB_USER'),
+                'PASSWORD': config('DB_PASSWORD'),
+                'HOST': config('DB_HOST'),
+                'PORT': config('DB_PORT', default='5432'),
+            }
         }
-    }
+
+    # Keep connections open between requests instead of paying a TCP, TLS
+    # and auth handshake on every request, and check them before reuse.
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+    })
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+    })
+
+    # Optional per-worker connection pool; requires psycopg 3 with the pool
+    # extra and replaces persistent connections.
+    DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=0, cast=int)
+    if DB_POOL_MAX_SIZE:
+        from psycopg_pool import ConnectionPool
+
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': DB_POOL_MAX_SIZE,
+            'check': ConnectionPool.check_connection,
+        }
+
+    # Optional read replica for wrap and profile reads
+    DATABASE_REPLICA_ALIAS = None
+    if 'DATABASE_REPLICA_URL' in os.environ:
+        replica = dj_database_url.parse(os.environ['DATABASE_REPLICA_URL'], ssl_require=True)
+        replica['CONN_MAX_AGE'] = DATABASES['default']['CONN_MAX_AGE']
+        replica['CONN_HEALTH_CHECKS'] = DATABASES['default']['CONN_HEALTH_CHECKS']
+        replica['OPTIONS'].update(
+            {key: value for key, value in DATABASES['default']['OPTIONS'].items() if key != 'sslmode'}
+        )
+        DATABASES['replica'] = replica
+        DATABASE_REPLICA_ALIAS = 'replica'
+
+DATABASE_ROUTERS = ['spotify_wrapped.routers.PrimaryReplicaRouter']
+# Seconds after a write during which the writer's reads go to the primary
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Authentication
+# UserProfileBackend loads the user and their profile in one query; ModelBackend
+# stays listed so sessions created before it was added remain valid.
+
+AUTHENTICATION_BACKENDS = [
+    'spotify_wrapped.backends.UserProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -164,14 +226,150 @@ LANGUAGES = [
 
 # Add this line to define the directory where static files will be collected
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATIC_URL = 'static/'
-django_heroku.settings(locals())
+STATIC_URL = '/static/'
+os.makedirs(STATIC_ROOT, exist_ok=True)
+
+# WhiteNoise serves collected static files gzip-compressed
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage',
+    },
+}
 
 # If you plan to store static files manually in the app
 STATICFILES_DIRS = [
     BASE_DIR / 'static'
 ]
 
+# Part of the cache key of the theme chrome fragments; set per deploy (Heroku
+# exposes the slug commit) so template changes are picked up.
+STATIC_VERSION = os.getenv('STATIC_VERSION', os.getenv('HEROKU_SLUG_COMMIT', ''))
+
+
+# Cache shared by all workers when REDIS_URL is set; otherwise each process
+# keeps its own in-memory cache. The circuit breakers keep their state here,
+# so without REDIS_URL every worker process has its own breakers, each of
+# which must see its own run of failures before it opens.
+if 'REDIS_URL' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Cached template fragments are small and read on every page, so they stay
+# in process memory rather than paying a round trip to a shared cache
+CACHES['template_fragments'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'template_fragments',
+}
+
+# Upstream timeouts. After CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive
+# failures calls to that upstream fail fast for CIRCUIT_BREAKER_RESET_SECONDS
+# before a single probe request is let through.
+SPOTIFY_TIMEOUT_SECONDS = config('SPOTIFY_TIMEOUT_SECONDS', default=5, cast=float)
+OPENAI_TIMEOUT_SECONDS = config('OPENAI_TIMEOUT_SECONDS', default=15, cast=float)
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = config('CIRCUIT_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+CIRCUIT_BREAKER_RESET_SECONDS = config('CIRCUIT_BREAKER_RESET_SECONDS', default=30, cast=int)
+
+# Top tracks and artists prefetched after login are kept this long for the
+# user's first wrap; at most SPOTIFY_PREFETCH_WORKERS prefetches run per process.
+SPOTIFY_PREFETCH_SECONDS = config('SPOTIFY_PREFETCH_SECONDS', default=300, cast=int)
+SPOTIFY_PREFETCH_WORKERS = config('SPOTIFY_PREFETCH_WORKERS', default=4, cast=int)
+
+# Shared artist metadata older than this is refreshed from Spotify when a
+# wrap needs it
+ARTIST_METADATA_MAX_AGE_DAYS = config('ARTIST_METADATA_MAX_AGE_DAYS', default=7, cast=int)
+
+# Shareable wrap cards are rendered once and cached on disk, evicting the
+# least recently used cards once the directory exceeds the size limit.
+WRAP_CARD_CACHE_DIR = os.getenv('WRAP_CARD_CACHE_DIR', os.path.join(BASE_DIR, 'wrap_cards'))
+WRAP_CARD_CACHE_MAX_BYTES = int(os.getenv('WRAP_CARD_CACHE_MAX_BYTES', 100 * 1024 * 1024))
+WRAP_CARD_FONT = os.getenv('WRAP_CARD_FONT', 'DejaVuSans.ttf')
+
+# Uploaded profile pictures are downscaled to PROFILE_PICTURE_MAX_DIMENSION and
+# get square WebP and JPEG thumbnails of each size; uploads larger than
+# PROFILE_PICTURE_INLINE_MAX_BYTES are processed in the background.
+PROFILE_PICTURE_MAX_DIMENSION = int(os.getenv('PROFILE_PICTURE_MAX_DIMENSION', 1024))
+PROFILE_PICTURE_THUMBNAIL_SIZES = [64, 128, 256]
+PROFILE_PICTURE_INLINE_MAX_BYTES = int(os.getenv('PROFILE_PICTURE_INLINE_MAX_BYTES', 1024 * 1024))
+
+# Requests for a wrap of the same timeframe within this many minutes return
+# the latest wrap instead of generating a new one.
+WRAP_IDEMPOTENCY_MINUTES = int(os.getenv('WRAP_IDEMPOTENCY_MINUTES', 10))
+
+# Wraps precomputed by generate_scheduled_wraps are returned for this many
+# hours instead, so peak-hour requests reuse the nightly run's wrap.
+WRAP_SCHEDULED_REUSE_HOURS = int(os.getenv('WRAP_SCHEDULED_REUSE_HOURS', 24))
+
+# Local hours (start inclusive, end exclusive) in which the
+# generate_scheduled_wraps command precomputes wraps for active users
+WRAP_BATCH_OFF_PEAK_HOURS = (
+    int(os.getenv('WRAP_BATCH_OFF_PEAK_START', 2)),
+    int(os.getenv('WRAP_BATCH_OFF_PEAK_END', 6)),
+)
+
+# Wraps older than WRAP_ARCHIVE_AFTER_DAYS are moved to the compressed archive
+# table by the archive_wraps command, which keeps at most
+# WRAP_ARCHIVE_MAX_PER_USER archived wraps per user (unlimited when unset).
+WRAP_ARCHIVE_AFTER_DAYS = int(os.getenv('WRAP_ARCHIVE_AFTER_DAYS', 30))
+WRAP_ARCHIVE_MAX_PER_USER = int(os.getenv('WRAP_ARCHIVE_MAX_PER_USER', 0)) or None
+
+# OpenAI prices in USD per 1K (prompt, completion) tokens, used by the
+# llm_usage_report command to estimate cost
+LLM_TOKEN_PRICES = {
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-4o': (0.0025, 0.01),
+}
+
+# Budget for worker start-up imports checked by the bench_import_time command
+IMPORT_TIME_BUDGET_MS = config('IMPORT_TIME_BUDGET_MS', default=600, cast=float)
+# Packages that must only be imported on first use, not at start-up
+IMPORT_TIME_FORBIDDEN_MODULES = ['openai', 'PIL']
+
+# Log to stdout, where Heroku collects it, in the format django-heroku used
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': ('%(asctime)s [%(process)d] [%(levelname)s] '
+                       'pathname=%(pathname)s lineno=%(lineno)s '
+                       'funcname=%(funcName)s %(message)s'),
+            'datefmt': '%Y-%m-%d %H:%M:%S'
+        },
+        'simple': {
+            'format': '%(levelname)s %(message)s'
+        }
+    },
+    'handlers': {
+        'null': {
+            'level': 'DEBUG',
+            'class': 'logging.NullHandler',
+        },
+        'console': {
+            'level': 'DEBUG',
+            'class': 'logging.StreamHandler',
+            'formatter': 'verbose'
+        }
+    },
+    'loggers': {
+        'testlogger': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        }
+    }
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
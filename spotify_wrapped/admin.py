@@ -1,16 +1,152 @@
 """
 Admin configuration for Spotify Wrapped models.
 """
-from django.contrib import admin
-from .models import UserProfile
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from .models import LLMUsage, UserProfile, SpotifyWraps
+from .views import TIME_RANGES
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses PostgreSQL's planner row estimate for unfiltered
+    changelists, avoiding a full COUNT(*) on large tables. Filtered querysets,
+    small tables and other databases fall back to an exact count.
+    """
+    EXACT_COUNT_THRESHOLD = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.EXACT_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class TimeframeListFilter(admin.SimpleListFilter):
+    """
+    Filters wraps by timeframe using the fixed TIME_RANGES choices, instead of
+    a field filter's SELECT DISTINCT over the whole table.
+    """
+    title = "length"
+    parameter_name = 'length'
+
+    def lookups(self, request, model_admin):
+        return [(timeframe, timeframe) for timeframe in TIME_RANGES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(length=self.value())
+        return queryset
 
 
 class UserProfileAdmin(admin.ModelAdmin):
     """
     Admin interface for the UserProfile model, displaying user-related fields.
     """
-    list_display = ('bio', 'profile_picture', 'favorite_genres', 'created_at')
+    list_display = ('spotify_username', 'user', 'bio', 'avatar', 'favorite_genres', 'created_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    # Exact, case-insensitive matches use the UPPER() indexes on UserProfile
+    search_fields = ('=spotify_username', '=spotify_user_id')
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['clear_spotify_tokens']
+
+    @admin.display(description="Profile picture")
+    def avatar(self, obj):
+        """
+        Shows the smallest thumbnail instead of the full-size picture.
+        """
+        url = obj.avatar_url()
+        return format_html('<img src="{}" width="32" height="32" alt="">', url) if url else ''
+
+    @admin.action(description="Clear Spotify tokens of selected profiles")
+    def clear_spotify_tokens(self, request, queryset):
+        """
+        Clears stored Spotify tokens with a single UPDATE.
+        """
+        updated = queryset.update(spotify_access_token=None, spotify_refresh_token=None, token_expires_at=None)
+        self.message_user(request, f"Cleared Spotify tokens of {updated} profiles.", messages.SUCCESS)
+
+
+class SpotifyWrapsAdmin(admin.ModelAdmin):
+    """
+    Admin interface for the SpotifyWraps model, built to browse large tables:
+    no exact counts, no per-row profile lookups and set-based bulk actions.
+    """
+    list_display = ('id', 'user_profile', 'length', 'date_time', 'num_distinct_artists', 'num_genres')
+    list_select_related = ('user_profile',)
+    list_filter = (TimeframeListFilter,)
+    raw_id_fields = ('user_profile',)
+    search_fields = ('=user_profile__spotify_username',)
+    date_hierarchy = 'date_time'
+    ordering = ('-date_time',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['delete_wraps', 'clear_descriptions']
+
+    def get_actions(self, request):
+        """
+        Removes the default delete action, which loads every selected wrap
+        to build its confirmation page.
+        """
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description="Delete selected wraps", permissions=['delete'])
+    def delete_wraps(self, request, queryset):
+        """
+        Deletes the selected wraps with a single DELETE.
+        """
+        deleted, _ = queryset.delete()
+        self.message_user(request, f"Deleted {deleted} wraps.", messages.SUCCESS)
+
+    @admin.action(description="Clear LLM descriptions of selected wraps", permissions=['change'])
+    def clear_descriptions(self, request, queryset):
+        """
+        Clears LLM descriptions with a single UPDATE; they are regenerated
+        the next time each wrap is viewed.
+        """
+        updated = queryset.update(LLM_description_en=None, LLM_description_az=None, LLM_description_ru=None)
+        self.message_user(request, f"Cleared descriptions of {updated} wraps.", messages.SUCCESS)
+
+
+class LLMUsageAdmin(admin.ModelAdmin):
+    """
+    Read-only admin interface for LLM token usage records.
+    """
+    list_display = ('created_at', 'wrap_id', 'user_profile', 'model', 'language',
+                    'prompt_tokens', 'completion_tokens', 'latency_ms')
+    list_select_related = ('user_profile',)
+    list_filter = ('model', 'language')
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 # Register the models with the admin site
-admin.site.register(UserProfile, UserProfileAdmin)
\ No newline at end of file
+admin.site.register(UserProfile, UserProfileAdmin)
+admin.site.register(SpotifyWraps, SpotifyWrapsAdmin)
+admin.site.register(LLMUsage, LLMUsageAdmin)
@@ -0,0 +1,29 @@
+"""
+Authentication backend that loads the user together with their profile.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class UserProfileBackend(ModelBackend):
+    """
+    Model backend that joins UserProfile onto the User lookup, so
+    request.user.userprofile is available without an extra query.
+    """
+
+    def get_user(self, user_id):
+        """
+        Fetches the user and their profile in a single query.
+
+        Args:
+            user_id (int): Primary key of the user stored in the session.
+
+        Returns:
+            User: The active user, or None if not found.
+        """
+        user_model = get_user_model()
+        try:
+            user = user_model._default_manager.select_related('userprofile').get(pk=user_id)
+        except user_model.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,170 @@
+"""
+Circuit breakers that stop calling Spotify or OpenAI while they are failing.
+
+Breaker state lives in the default cache so every worker sees the same state
+when a shared cache (e.g. Redis) is configured.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class UpstreamError(Exception):
+    """
+    Raised when an upstream call fails or is refused by its breaker.
+    """
+
+
+class CircuitOpenError(UpstreamError):
+    """
+    Raised instead of calling an upstream whose breaker is open.
+    """
+
+
+class UpstreamRejectedError(UpstreamError):
+    """
+    Raised when an upstream answers but rejects the request, e.g. an expired
+    or revoked token. It says nothing about the upstream's health, so it does
+    not count against the breaker.
+    """
+
+
+class CircuitBreaker:
+    """
+    A closed/open/half-open circuit breaker. After CIRCUIT_BREAKER_FAILURE_THRESHOLD
+    consecutive failures the breaker opens and calls fail fast. After
+    CIRCUIT_BREAKER_RESET_SECONDS it is half-open: one worker probes the upstream,
+    closing the breaker on success and reopening it on failure.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def _key(self, suffix):
+        return f"circuit:{self.name}:{suffix}"
+
+    def _transition(self, old_state, new_state):
+        """
+        Logs a state change and counts it for the upstream_status metrics.
+        """
+        logger.warning("Circuit breaker %s: %s -> %s", self.name, old_state, new_state)
+        key = self._key(f"transitions:{new_state}")
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+    def _state(self, opened_at):
+        if opened_at is None:
+            return CLOSED
+        if time.time() - opened_at < settings.CIRCUIT_BREAKER_RESET_SECONDS:
+            return OPEN
+        return HALF_OPEN
+
+    @property
+    def state(self):
+        """
+        str: The breaker's current state.
+        """
+        return self._state(cache.get(self._key('opened_at')))
+
+    def allow_request(self):
+        """
+        Returns whether the upstream may be called now. Once the breaker is
+        half-open only the first caller is allowed through, as the probe.
+
+        Returns:
+            bool: True if the call may go ahead.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and cache.add(self._key('probe'), 1, timeout=settings.CIRCUIT_BREAKER_RESET_SECONDS):
+            self._transition(OPEN, HALF_OPEN)
+            return True
+        return False
+
+    def record_success(self):
+        """
+        Clears the failure count, closing the breaker after a successful probe.
+        """
+        values = cache.get_many([self._key('opened_at'), self._key('failures')])
+        if self._key('opened_at') in values:
+            cache.delete_many([self._key('opened_at'), self._key('probe')])
+            self._transition(HALF_OPEN, CLOSED)
+        if values:
+            cache.delete(self._key('failures'))
+
+    def record_failure(self):
+        """
+        Counts a failure, opening the breaker at the threshold or reopening
+        it after a failed probe.
+        """
+        if cache.get(self._key('opened_at')) is not None:
+            cache.set(self._key('opened_at'), time.time(), timeout=None)
+            cache.delete(self._key('probe'))
+            self._transition(HALF_OPEN, OPEN)
+            return
+
+        cache.add(self._key('failures'), 0, timeout=None)
+        if cache.incr(self._key('failures')) >= settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+            # add() lets only one worker open the breaker
+            if cache.add(self._key('opened_at'), time.time(), timeout=None):
+                cache.delete(self._key('failures'))
+                self._transition(CLOSED, OPEN)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Calls func through the breaker.
+
+        Args:
+            func (callable): The upstream call; any exception counts as a failure.
+
+        Returns:
+            The result of func.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+            UpstreamError: If func raised, chained to the original exception.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} is unavailable")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as exc:
+            self.record_failure()
+            raise UpstreamError(f"{self.name} call failed") from exc
+        self.record_success()
+        return result
+
+    def snapshot(self):
+        """
+        Returns the breaker's state and counters for the upstream_status view.
+
+        Returns:
+            dict: State, consecutive failures, open time and transition counts.
+        """
+        keys = [self._key('opened_at'), self._key('failures')]
+        keys += [self._key(f"transitions:{state}") for state in (CLOSED, OPEN, HALF_OPEN)]
+        values = cache.get_many(keys)
+        opened_at = values.get(self._key('opened_at'))
+        return {
+            'state': self._state(opened_at),
+            'failures': values.get(self._key('failures'), 0),
+            'opened_at': opened_at,
+            'transitions': {
+                state: values.get(self._key(f"transitions:{state}"), 0) for state in (CLOSED, OPEN, HALF_OPEN)
+            },
+        }
+
+
+spotify_breaker = CircuitBreaker('spotify')
+openai_breaker = CircuitBreaker('openai')
+
+BREAKERS = [spotify_breaker, openai_breaker]
@@ -0,0 +1,188 @@
+"""
+Rendering and on-disk caching of shareable wrap summary cards.
+"""
+import io
+import json
+import os
+import tempfile
+import textwrap
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+
+CARD_SIZE = (800, 1000)
+CARD_FORMATS = {
+    'png': ('PNG', 'image/png'),
+    'webp': ('WEBP', 'image/webp'),
+}
+
+# Background, text and accent colors for each theme
+CARD_THEMES = {
+    'light': ('#FFFFFF', '#000000', '#1DB954'),
+    'dark': ('#0D0D0D', '#FFFFFF', '#1DB954'),
+    'holiday': ('#0D0D0D', '#FFFFFF', '#FF7518'),
+}
+
+
+def _load_font(size):
+    """
+    Loads the card font, falling back to Pillow's bundled font.
+
+    Args:
+        size (int): Font size in pixels.
+
+    Returns:
+        ImageFont: The loaded font.
+    """
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype(settings.WRAP_CARD_FONT, size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def render_wrap_card(wrap, description, theme):
+    """
+    Draws a summary card with a wrap's top songs, artists, genres and description.
+
+    Args:
+        wrap (SpotifyWraps): The wrap to summarize.
+        description (str): The LLM description in the card's language.
+        theme (str): One of the CARD_THEMES keys.
+
+    Returns:
+        Image: The rendered card.
+    """
+    from PIL import Image, ImageDraw
+
+    background, text_color, accent = CARD_THEMES.get(theme, CARD_THEMES['dark'])
+    title_font = _load_font(44)
+    heading_font = _load_font(28)
+    body_font = _load_font(24)
+
+    image = Image.new('RGB', CARD_SIZE, background)
+    draw = ImageDraw.Draw(image)
+    x, y = 50, 50
+
+    draw.text((x, y), _("Your Autumn Anthem"), font=title_font, fill=accent)
+    y += 60
+    draw.text((x, y), _(wrap.length) if wrap.length else '', font=body_font, fill=text_color)
+    y += 60
+
+    sections = [
+        (_("Here are your top 5 songs:"), json.loads(wrap.top_songs)),
+        (_("Here are your top 5 artists:"), json.loads(wrap.top_artists)),
+        (_("Here are your top 5 genres:"), json.loads(wrap.top_genres)),
+    ]
+    for heading, items in sections:
+        draw.text((x, y), heading, font=heading_font, fill=accent)
+        y += 40
+        for number, item in enumerate(items[:5], start=1):
+            draw.text((x, y), textwrap.shorten(f"{number}. {item}", width=55), font=body_font, fill=text_color)
+            y += 32
+        y += 20
+
+    for line in textwrap.wrap(description or '', width=60)[:6]:
+        draw.text((x, y), line, font=body_font, fill=text_color)
+        y += 32
+
+    return image
+
+
+def _evict_cards(cache_dir, max_bytes, keep):
+    """
+    Deletes the least recently used cards until the cache fits in max_bytes.
+
+    Args:
+        cache_dir (str): Directory holding the cached cards.
+        max_bytes (int): Maximum total size of the cache.
+        keep (str): Path of the card just written, which is never evicted.
+    """
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if entry.is_file() and entry.path != keep:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(entry[1] for entry in entries) + os.path.getsize(keep)
+    for _mtime, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def open_wrap_card(wrap, language, theme, image_format, describe):
+    """
+    Opens a wrap's cached card, rendering it on a cache miss. Cache hits
+    refresh the file's modification time, which eviction uses as the
+    least-recently-used order. The file is opened before eviction runs, so a
+    concurrent eviction cannot remove it from under the caller.
+
+    Args:
+        wrap (SpotifyWraps): The wrap to summarize.
+        language (str): Language code of the card.
+        theme (str): Theme of the card.
+        image_format (str): One of the CARD_FORMATS keys.
+        describe (callable): Returns the wrap's description, or None if it
+            is not available; only called on a miss.
+
+    Returns:
+        file: The card image opened in binary mode, or an in-memory copy if
+            it was rendered without a description.
+    """
+    cache_dir = settings.WRAP_CARD_CACHE_DIR
+    path = os.path.join(cache_dir, f"{wrap.id}-{language}-{theme}.{image_format}")
+    try:
+        card = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        os.utime(card.fileno())
+        return card
+
+    description = describe()
+    image = render_wrap_card(wrap, description, theme)
+    if not description:
+        # Cards without their description are served once and not cached,
+        # so the next request renders the description when it is available
+        buffer = io.BytesIO()
+        image.save(buffer, CARD_FORMATS[image_format][0])
+        buffer.seek(0)
+        return buffer
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file first so readers never see a partial card
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as tmp_file:
+        image.save(tmp_file, CARD_FORMATS[image_format][0])
+    os.replace(tmp_path, path)
+
+    card = open(path, 'rb')
+    _evict_cards(cache_dir, settings.WRAP_CARD_CACHE_MAX_BYTES, keep=path)
+    return card
+
+
+def delete_wrap_cards(wrap_id):
+    """
+    Removes every cached card of a wrap.
+
+    Args:
+        wrap_id (int): The wrap's id.
+    """
+    cache_dir = settings.WRAP_CARD_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return
+    prefix = f"{wrap_id}-"
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if entry.name.startswith(prefix):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
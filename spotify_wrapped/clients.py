@@ -0,0 +1,37 @@
+"""
+Lazily created, process-wide clients for upstream HTTP APIs.
+
+The openai and requests packages are only imported the first time a client
+is needed, keeping them out of worker start-up.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+
+
+@lru_cache(maxsize=1)
+def get_openai_client():
+    """
+    Returns the OpenAI client shared by this process.
+
+    Returns:
+        OpenAI: The client, created on first use.
+    """
+    from openai import OpenAI
+
+    # Fail fast and let the circuit breaker handle outages instead of retrying
+    return OpenAI(api_key=settings.OPENAI_KEY_SECRET, timeout=settings.OPENAI_TIMEOUT_SECONDS, max_retries=0)
+
+
+@lru_cache(maxsize=1)
+def get_http_session():
+    """
+    Returns the requests session shared by this process, which keeps
+    connections to Spotify alive between calls.
+
+    Returns:
+        requests.Session: The session, created on first use.
+    """
+    import requests
+
+    return requests.Session()
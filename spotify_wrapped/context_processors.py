@@ -0,0 +1,69 @@
+"""
+Template context processors for the Spotify Wrapped app.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import translation
+
+from .models import UserProfile
+
+
+def spotify_username(request):
+    """
+    Adds the logged-in user's Spotify username to every template context.
+
+    Args:
+        request (HttpRequest): The request object.
+
+    Returns:
+        dict: Context containing 'spotify_username' for authenticated users.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    try:
+        return {'spotify_username': user.userprofile.spotify_username}
+    except UserProfile.DoesNotExist:
+        return {}
+
+
+@lru_cache(maxsize=1)
+def get_static_version():
+    """
+    Returns a version string that changes whenever static files or the
+    deployed code change, used to key the cached template chrome.
+
+    Returns:
+        str: A hash of the collected static manifest, if any, followed by STATIC_VERSION.
+    """
+    manifest = os.path.join(settings.STATIC_ROOT, 'staticfiles.json')
+    try:
+        with open(manifest, 'rb') as manifest_file:
+            digest = hashlib.blake2b(manifest_file.read(), digest_size=8).hexdigest()
+    except FileNotFoundError:
+        digest = ''
+    return f"{digest}{settings.STATIC_VERSION}"
+
+
+def theme_chrome(request):
+    """
+    Adds the values the theme-dependent page chrome is rendered and cached by.
+
+    Args:
+        request (HttpRequest): The request object.
+
+    Returns:
+        dict: Context containing 'theme', 'icon_suffix', 'language' and 'static_version'.
+    """
+    session = getattr(request, 'session', None)
+    theme = session.get('theme') if session is not None else None
+    return {
+        'theme': theme,
+        # Light theme icons are the "_black" variants
+        'icon_suffix': '_black' if theme == 'light' else '',
+        'language': translation.get_language(),
+        'static_version': get_static_version(),
+    }
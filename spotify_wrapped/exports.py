@@ -0,0 +1,134 @@
+"""
+Streaming export and import of a user's wrap history as NDJSON or CSV.
+"""
+import csv
+import json
+
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedSpotifyWraps, SpotifyWraps
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Wrap fields written to an export, in column order
+EXPORT_FIELDS = [
+    'date_time', 'length', 'top_songs', 'top_artists', 'top_genres', 'last_5_tracks', 'last_5_artists',
+    'num_distinct_artists', 'num_genres', 'LLM_description_en', 'LLM_description_az', 'LLM_description_ru',
+]
+# Fields stored as JSON strings on the wrap
+JSON_FIELDS = ['top_songs', 'top_artists', 'top_genres', 'last_5_tracks', 'last_5_artists']
+INTEGER_FIELDS = ['num_distinct_artists', 'num_genres']
+
+
+class _Echo:
+    """
+    File-like object whose write() returns the written line, so csv.writer
+    can produce rows one at a time.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_user_wraps(user_profile, chunk_size=500):
+    """
+    Yields every wrap of a user, archived ones first, oldest first. Rows are
+    read in chunks so memory stays constant however long the history is.
+
+    Args:
+        user_profile (UserProfile): The user's profile.
+        chunk_size (int): Number of rows fetched per database round trip.
+
+    Yields:
+        SpotifyWraps: Each wrap, rebuilt from the archive where needed.
+    """
+    archived = ArchivedSpotifyWraps.objects.filter(user_profile=user_profile).order_by('date_time')
+    for archived_wrap in archived.iterator(chunk_size=chunk_size):
+        yield archived_wrap.to_wrap()
+    wraps = SpotifyWraps.objects.filter(user_profile=user_profile).order_by('date_time')
+    yield from wraps.iterator(chunk_size=chunk_size)
+
+
+def iter_ndjson(wraps):
+    """
+    Yields one JSON line per wrap, with JSON string fields decoded.
+
+    Args:
+        wraps (iterable): The wraps to export.
+
+    Yields:
+        str: Newline-terminated JSON objects.
+    """
+    for wrap in wraps:
+        record = {field: getattr(wrap, field) for field in EXPORT_FIELDS}
+        record['date_time'] = wrap.date_time.isoformat()
+        for field in JSON_FIELDS:
+            record[field] = json.loads(record[field])
+        yield json.dumps(record) + "\n"
+
+
+def iter_csv(wraps):
+    """
+    Yields a header row and one CSV row per wrap; JSON string fields are
+    written as is.
+
+    Args:
+        wraps (iterable): The wraps to export.
+
+    Yields:
+        str: CSV lines.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for wrap in wraps:
+        row = [getattr(wrap, field) for field in EXPORT_FIELDS]
+        row[0] = wrap.date_time.isoformat()
+        yield writer.writerow(row)
+
+
+def read_records(lines, export_format):
+    """
+    Parses the records of an NDJSON or CSV export.
+
+    Args:
+        lines (iterable): Lines of the export file.
+        export_format (str): One of the EXPORT_FORMATS keys.
+
+    Yields:
+        dict: Export records keyed by field name.
+    """
+    if export_format == 'csv':
+        yield from csv.DictReader(lines)
+    else:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+def record_to_wrap(record, user_profile):
+    """
+    Builds an unsaved wrap from an export record.
+
+    Args:
+        record (dict): A record from read_records.
+        user_profile (UserProfile): The profile the wrap is restored to.
+
+    Returns:
+        SpotifyWraps: The unsaved wrap.
+    """
+    values = {}
+    for field in EXPORT_FIELDS:
+        value = record.get(field)
+        if field in JSON_FIELDS:
+            value = value if isinstance(value, str) and value else json.dumps(value or [])
+        elif value == '':
+            # CSV has no null, so empty values are read back as None
+            value = None
+        elif field in INTEGER_FIELDS and value is not None:
+            value = int(value)
+        values[field] = value
+    values['date_time'] = parse_datetime(values['date_time'])
+    return SpotifyWraps(user_profile=user_profile, **values)
@@ -0,0 +1,80 @@
+"""
+Management command that moves old wraps into the compressed archive table.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from spotify_wrapped.models import ArchivedSpotifyWraps, SpotifyWraps
+
+
+class Command(BaseCommand):
+    """
+    Archives wraps older than a threshold and enforces per-user archive retention.
+    """
+    help = "Moves old SpotifyWraps rows into the compressed archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.WRAP_ARCHIVE_AFTER_DAYS,
+            help="Archive wraps created more than this many days ago.",
+        )
+        parser.add_argument(
+            '--keep-per-user', type=int, default=settings.WRAP_ARCHIVE_MAX_PER_USER,
+            help="Maximum archived wraps kept per user; older ones are deleted.",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        archived = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    SpotifyWraps.objects.select_for_update(skip_locked=True)
+                    .filter(date_time__lt=cutoff)
+                    .order_by('id')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                ArchivedSpotifyWraps.objects.bulk_create(
+                    [ArchivedSpotifyWraps.from_wrap(wrap) for wrap in batch],
+                    ignore_conflicts=True,
+                )
+                SpotifyWraps.objects.filter(id__in=[wrap.id for wrap in batch]).delete()
+            archived += len(batch)
+        self.stdout.write(f"Archived {archived} wraps.")
+
+        keep = options['keep_per_user']
+        if keep is not None:
+            self.stdout.write(f"Deleted {self.enforce_retention(keep)} archived wraps over the per-user limit.")
+
+    def enforce_retention(self, keep):
+        """
+        Deletes each user's oldest archived wraps beyond the retention limit.
+
+        Args:
+            keep (int): Number of archived wraps to keep per user.
+
+        Returns:
+            int: Number of archived wraps deleted.
+        """
+        deleted = 0
+        over_limit = (
+            ArchivedSpotifyWraps.objects.values('user_profile')
+            .annotate(total=Count('id'))
+            .filter(total__gt=keep)
+            .values_list('user_profile', flat=True)
+        )
+        for user_profile_id in over_limit.iterator():
+            expired = list(
+                ArchivedSpotifyWraps.objects.filter(user_profile_id=user_profile_id)
+                .order_by('-date_time')
+                .values_list('id', flat=True)[keep:]
+            )
+            deleted += ArchivedSpotifyWraps.objects.filter(id__in=expired).delete()[0]
+        return deleted
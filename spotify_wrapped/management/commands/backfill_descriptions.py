@@ -0,0 +1,176 @@
+"""
+Management command that generates missing or outdated LLM wrap descriptions.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Case, F, Q, Value, When
+
+from spotify_wrapped.breakers import CircuitOpenError, UpstreamError
+from spotify_wrapped.models import Checkpoint, SpotifyWraps
+from spotify_wrapped.views import build_wrap_prompt, generate_wrap_description
+
+
+def close_worker_connections(executor, workers):
+    """
+    Closes the database connections of every worker thread of an executor.
+    Each worker runs exactly one closing task, as every task waits at a
+    barrier until all of them have started.
+
+    Args:
+        executor (ThreadPoolExecutor): The executor.
+        workers (int): The executor's max_workers.
+    """
+    barrier = threading.Barrier(workers)
+
+    def close():
+        barrier.wait()
+        connections.close_all()
+
+    for future in [executor.submit(close) for _ in range(workers)]:
+        future.result()
+
+
+class Command(BaseCommand):
+    """
+    Scans wraps in id order and generates descriptions with bounded
+    concurrency and a request rate budget. Progress is checkpointed after
+    every batch, so an interrupted run resumes where it stopped.
+    """
+    help = "Backfills LLM descriptions of wraps, resuming from the last checkpoint."
+
+    def add_arguments(self, parser):
+        languages = [code for code, _name in settings.LANGUAGES]
+        parser.add_argument(
+            '--languages', nargs='+', choices=languages, default=languages,
+            help="Languages to backfill; defaults to every configured language.",
+        )
+        parser.add_argument(
+            '--regenerate', action='store_true',
+            help="Regenerate existing descriptions too, e.g. after a prompt change.",
+        )
+        parser.add_argument('--concurrency', type=int, default=4, help="Maximum generations in flight.")
+        parser.add_argument('--rate', type=float, default=5, help="Maximum generations started per second.")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--reset', action='store_true', help="Ignore the checkpoint and start over.")
+
+    def handle(self, *args, **options):
+        languages = options['languages']
+        fields = [f'LLM_description_{language}' for language in languages]
+        regenerate = options['regenerate']
+
+        name = f"backfill_descriptions:{','.join(sorted(languages))}{':regenerate' if regenerate else ''}"
+        checkpoint, _ = Checkpoint.objects.get_or_create(name=name)
+        if options['reset']:
+            checkpoint.last_id = 0
+
+        queryset = SpotifyWraps.objects.only(
+            'id', 'user_profile_id', 'top_songs', 'top_artists', 'top_genres',
+            'num_distinct_artists', 'num_genres', *fields,
+        ).order_by('id')
+        if not regenerate:
+            missing = Q()
+            for field in fields:
+                missing |= Q(**{f'{field}__isnull': True}) | Q(**{field: ''})
+            queryset = queryset.filter(missing)
+
+        interval = 1 / options['rate']
+        next_start = time.monotonic()
+        generated = failed = 0
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            try:
+                while True:
+                    batch = list(queryset.filter(id__gt=checkpoint.last_id)[:options['batch_size']])
+                    if not batch:
+                        break
+
+                    futures = []
+                    for wrap in batch:
+                        for language, field in zip(languages, fields):
+                            if regenerate or not getattr(wrap, field):
+                                # Space out starts to stay within the rate budget
+                                delay = next_start - time.monotonic()
+                                if delay > 0:
+                                    time.sleep(delay)
+                                next_start = max(next_start, time.monotonic()) + interval
+                                futures.append((executor.submit(self.describe, wrap, language), wrap, field))
+
+                    circuit_open = False
+                    descriptions = {field: {} for field in fields}
+                    for future, wrap, field in futures:
+                        try:
+                            descriptions[field][wrap.pk] = future.result()
+                            generated += 1
+                        except CircuitOpenError:
+                            circuit_open = True
+                        except UpstreamError:
+                            failed += 1
+                    self.save(descriptions, regenerate)
+
+                    if circuit_open:
+                        checkpoint.save()
+                        raise CommandError(
+                            f"OpenAI is unavailable; re-run to resume after wrap {checkpoint.last_id}. "
+                            f"Generated {generated} descriptions."
+                        )
+                    checkpoint.last_id = batch[-1].id
+                    checkpoint.save()
+                    self.stdout.write(
+                        f"Processed wraps up to {checkpoint.last_id}: {generated} generated, {failed} failed."
+                    )
+            finally:
+                # Worker threads open their own connection to record LLM usage
+                close_worker_connections(executor, options['concurrency'])
+
+        # A finished run starts over next time, e.g. after the next prompt change
+        checkpoint.delete()
+        self.stdout.write(f"Generated {generated} descriptions, {failed} failed.")
+
+    @staticmethod
+    def save(descriptions, regenerate):
+        """
+        Writes a batch's generated descriptions with one UPDATE per language.
+        Unless regenerating, a description saved meanwhile, e.g. by a user
+        viewing the wrap, is kept.
+
+        Args:
+            descriptions (dict): Generated descriptions keyed by field, then wrap id.
+            regenerate (bool): Whether existing descriptions are replaced.
+        """
+        for field, by_id in descriptions.items():
+            if not by_id:
+                continue
+            queryset = SpotifyWraps.objects.filter(pk__in=list(by_id))
+            if not regenerate:
+                queryset = queryset.filter(Q(**{f'{field}__isnull': True}) | Q(**{field: ''}))
+            queryset.update(**{field: Case(
+                *[When(pk=pk, then=Value(description)) for pk, description in by_id.items()],
+                default=F(field),
+                output_field=SpotifyWraps._meta.get_field(field),
+            )})
+
+    @staticmethod
+    def describe(wrap, language):
+        """
+        Generates one description on a worker thread.
+
+        Args:
+            wrap (SpotifyWraps): The wrap to describe.
+            language (str): Language code of the description.
+
+        Returns:
+            str: The generated description.
+        """
+        return generate_wrap_description(build_wrap_prompt(
+            json.loads(wrap.top_songs),
+            json.loads(wrap.top_artists),
+            json.loads(wrap.top_genres),
+            wrap.num_distinct_artists,
+            wrap.num_genres,
+            language,
+        ), wrap, language)
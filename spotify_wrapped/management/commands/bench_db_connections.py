@@ -0,0 +1,45 @@
+"""
+Management command that measures per-request database connection overhead.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    """
+    Compares opening a new connection per request with reusing a persistent one.
+    """
+    help = "Benchmarks per-request database connection overhead with and without connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        iterations = options['iterations']
+
+        def run_request(reuse):
+            # Mirrors what Django does around each request
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            if not reuse:
+                connection.close()
+
+        results = {}
+        for label, reuse in (("new connection per request", False), ("persistent connection", True)):
+            connection.close()
+            run_request(reuse)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                run_request(reuse)
+            results[label] = (time.perf_counter() - start) * 1000 / iterations
+            self.stdout.write(f"{label}: {results[label]:.2f} ms/request")
+
+        connection.close()
+        saved = results["new connection per request"] - results["persistent connection"]
+        self.stdout.write(f"connection overhead saved: {saved:.2f} ms/request")
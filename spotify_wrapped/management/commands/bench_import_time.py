@@ -0,0 +1,82 @@
+"""
+Management command that measures worker cold-start import time.
+"""
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Loads the WSGI application and the URLconf (and with it the views), which
+# is what a worker imports before serving its first request
+STARTUP_CODE = (
+    "import CS2340_Team39_Project2.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+STARTUP_MODULE = 'CS2340_Team39_Project2.wsgi'
+# URLconf and view modules first imported after the WSGI application
+URLCONF_MODULE = re.compile(r"(^|\.)(urls|views)(\.|$)")
+
+
+class Command(BaseCommand):
+    """
+    Runs the worker start-up imports under `python -X importtime` and fails
+    when they exceed the import-time budget or load a module that should be
+    deferred to first use.
+    """
+    help = "Measures cold-start import time of the WSGI application against a budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-ms', type=float, default=settings.IMPORT_TIME_BUDGET_MS,
+            help="Fail when start-up imports take longer than this many milliseconds.",
+        )
+        parser.add_argument('--top', type=int, default=10, help="Number of slowest top-level imports to list.")
+        parser.add_argument(
+            '--forbid', nargs='*', default=settings.IMPORT_TIME_FORBIDDEN_MODULES,
+            help="Fail when any of these packages is imported at start-up, however deeply.",
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'CS2340_Team39_Project2.settings'}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False,
+        )
+        if result.returncode:
+            raise CommandError(f"Start-up imports failed:\n{result.stderr}")
+
+        # Top-level imports have the smallest indentation. Only the WSGI
+        # application and the URLconf and views loaded after it count towards
+        # the budget, not what the interpreter imports first, e.g. site
+        top_level = []
+        imported = set()
+        started = False
+        for line in result.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                module = match.group(4)
+                imported.add(module)
+                if len(match.group(3)) == 1:
+                    started = started or module == STARTUP_MODULE
+                    if module == STARTUP_MODULE or (started and URLCONF_MODULE.search(module)):
+                        top_level.append((int(match.group(2)), module))
+        total_ms = sum(cumulative for cumulative, _module in top_level) / 1000
+
+        for cumulative, module in sorted(top_level, reverse=True)[:options['top']]:
+            self.stdout.write(f"{cumulative / 1000:8.1f} ms  {module}")
+        self.stdout.write(f"total: {total_ms:.1f} ms (budget {options['budget_ms']:.0f} ms)")
+
+        forbidden = sorted(
+            module for module in imported
+            if any(module == package or module.startswith(f'{package}.') for package in options['forbid'])
+        )
+        if forbidden:
+            raise CommandError(f"Start-up imported deferred modules: {', '.join(forbidden)}.")
+        if total_ms > options['budget_ms']:
+            raise CommandError(f"Start-up imports took {total_ms:.1f} ms, over the {options['budget_ms']:.0f} ms budget.")
+        return None
@@ -0,0 +1,65 @@
+"""
+Management command that measures page render time with and without the
+cached theme chrome fragments.
+"""
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+
+PAGES = [
+    'index.html', 'settings.html', 'wraps.html', 'wrap_base.html',
+    'wrap1.html', 'wrap2.html', 'wrap3.html', 'wrap4.html', 'wrap5.html', 'wrap6.html', 'wrap7.html',
+]
+
+SAMPLE_CONTEXT = {
+    'length': '1 month',
+    'top_songs': ["Song1", "Song2", "Song3", "Song4", "Song5"],
+    'top_artists': ["Artist1", "Artist2", "Artist3", "Artist4", "Artist5"],
+    'top_genres': ["pop", "rock", "jazz", "indie", "soul"],
+    'num_distinct_artists': 5,
+    'num_genres': 5,
+    'wrap_num': 1,
+    'wrap_LLM_en': "Description",
+    'wraps': [],
+}
+
+# Without a working cache every fragment is rendered, as before caching
+UNCACHED = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    """
+    Renders each page repeatedly and reports the time per render with the
+    chrome fragments re-rendered every time and served from the cache.
+    """
+    help = "Benchmarks page render time with and without cached theme chrome."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--theme', default='dark', choices=['dark', 'light', 'holiday'])
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.session = {'theme': options['theme']}
+        request.user = AnonymousUser()
+        iterations = options['iterations']
+
+        def time_page(template):
+            render_to_string(template, SAMPLE_CONTEXT, request=request)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                render_to_string(template, SAMPLE_CONTEXT, request=request)
+            return (time.perf_counter() - start) * 1000 / iterations
+
+        self.stdout.write("page\tuncached_ms\tcached_ms")
+        for template in PAGES:
+            with override_settings(CACHES=UNCACHED):
+                uncached = time_page(template)
+            cached = time_page(template)
+            self.stdout.write(f"{template}\t{uncached:.3f}\t{cached:.3f}")
@@ -0,0 +1,154 @@
+"""
+Management command that precomputes wraps for active users off-peak.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from spotify_wrapped.breakers import OPEN, UpstreamRejectedError, spotify_breaker
+from spotify_wrapped.clients import get_http_session
+from spotify_wrapped.models import SpotifyWraps, UserProfile
+from spotify_wrapped.utils import refresh_spotify_token
+from spotify_wrapped.views import TIME_RANGES, ensure_wrap_description, get_or_create_wrap_for_timeframe
+
+
+def in_off_peak_window(hour, window):
+    """
+    Returns whether a local hour falls in the off-peak window.
+
+    Args:
+        hour (int): Local hour of the day.
+        window (tuple): Start hour (inclusive) and end hour (exclusive); the
+            window may wrap past midnight.
+
+    Returns:
+        bool: True inside the window.
+    """
+    start, end = window
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class Command(BaseCommand):
+    """
+    Creates a wrap for every active user who has no recent one, with its
+    description in every configured language, so wraps are ready before peak
+    hours without peak-time Spotify and OpenAI calls. Users can be split into
+    shards run by separate processes.
+    """
+    help = "Precomputes wraps for active users during off-peak hours."
+
+    def add_arguments(self, parser):
+        languages = [code for code, _name in settings.LANGUAGES]
+        parser.add_argument('--timeframe', choices=list(TIME_RANGES), default="1 month")
+        parser.add_argument(
+            '--languages', nargs='+', choices=languages, default=languages,
+            help="Description languages to generate; defaults to every configured language.",
+        )
+        parser.add_argument(
+            '--active-days', type=int, default=30,
+            help="Only users who logged in within this many days.",
+        )
+        parser.add_argument(
+            '--skip-recent-hours', type=int, default=20,
+            help="Skip users who already have a wrap of the timeframe this recent.",
+        )
+        parser.add_argument('--shards', type=int, default=1, help="Number of shards users are split into.")
+        parser.add_argument('--shard', type=int, default=0, help="Shard processed by this run.")
+        parser.add_argument('--concurrency', type=int, default=4, help="Maximum users processed at once.")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--force', action='store_true', help="Run outside the off-peak window.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['shard'] < options['shards']:
+            raise CommandError("--shard must be between 0 and --shards - 1.")
+        window = settings.WRAP_BATCH_OFF_PEAK_HOURS
+        if not options['force'] and not in_off_peak_window(timezone.localtime().hour, window):
+            raise CommandError(f"Outside the off-peak window {window[0]}:00-{window[1]}:00; use --force to run anyway.")
+
+        timeframe = options['timeframe']
+        languages = options['languages']
+        concurrency = options['concurrency']
+        now = timezone.now()
+        recent_wrap = SpotifyWraps.objects.filter(
+            user_profile=OuterRef('pk'),
+            length=timeframe,
+            date_time__gte=now - timedelta(hours=options['skip_recent_hours']),
+        )
+        profile_ids = (
+            UserProfile.objects
+            .exclude(spotify_refresh_token__isnull=True).exclude(spotify_refresh_token='')
+            .filter(user__last_login__gte=now - timedelta(days=options['active_days']))
+            .alias(shard=Mod('id', options['shards'])).filter(shard=options['shard'])
+            .exclude(Exists(recent_wrap))
+            .order_by('id').values_list('id', flat=True)
+        )
+
+        # Size the shared session's connection pool for the worker threads
+        from requests.adapters import HTTPAdapter
+
+        get_http_session().mount('https://', HTTPAdapter(pool_maxsize=max(concurrency, 10)))
+
+        counts = {'created': 0, 'reused': 0, 'rejected': 0, 'failed': 0}
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                ids = list(profile_ids.filter(id__gt=last_id)[:options['batch_size']])
+                if not ids:
+                    break
+                if spotify_breaker.state == OPEN:
+                    self.stderr.write("Spotify is unavailable; stopping early.")
+                    break
+                last_id = ids[-1]
+                profiles = UserProfile.objects.filter(id__in=ids)
+                if concurrency > 1:
+                    results = executor.map(lambda profile: self.generate(profile, timeframe, languages), profiles)
+                else:
+                    results = [self.generate(profile, timeframe, languages) for profile in profiles]
+                for result in results:
+                    counts[result] += 1
+
+        self.stdout.write(
+            f"Created {counts['created']} wraps, reused {counts['reused']}; "
+            f"Spotify rejected {counts['rejected']} users, {counts['failed']} failed."
+        )
+
+    def generate(self, user_profile, timeframe, languages):
+        """
+        Creates one user's wrap and its descriptions, refreshing their access
+        token first if needed. Users whose token cannot be refreshed or is
+        rejected by Spotify are skipped without saving a wrap.
+
+        Args:
+            user_profile (UserProfile): The user's profile.
+            timeframe (str): The time range for the wrap.
+            languages (list): Language codes of the descriptions to generate.
+
+        Returns:
+            str: 'created', 'reused', 'rejected' or 'failed'.
+        """
+        try:
+            expires_at = user_profile.token_expires_at
+            if expires_at is None or expires_at <= timezone.now() + timedelta(minutes=5):
+                if not refresh_spotify_token(user_profile):
+                    return 'rejected'
+            wrap, created = get_or_create_wrap_for_timeframe(user_profile, timeframe, scheduled=True)
+            for language in languages:
+                ensure_wrap_description(wrap, language)
+            return 'created' if created else 'reused'
+        except UpstreamRejectedError:
+            return 'rejected'
+        except Exception as exc:
+            self.stderr.write(f"Could not create a wrap for user profile {user_profile.id}: {exc}")
+            return 'failed'
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
@@ -0,0 +1,44 @@
+"""
+Management command that creates thumbnails for existing profile pictures.
+"""
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from spotify_wrapped.models import UserProfile
+from spotify_wrapped.thumbnails import THUMBNAIL_FORMATS, make_thumbnails, thumbnail_name
+
+
+class Command(BaseCommand):
+    """
+    Downscales existing profile pictures and writes their thumbnails,
+    skipping pictures whose thumbnails already exist.
+    """
+    help = "Backfills profile picture thumbnails for existing uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate existing thumbnails too.")
+
+    def handle(self, *args, **options):
+        names = (
+            UserProfile.objects.exclude(profile_picture__isnull=True).exclude(profile_picture='')
+            .values_list('profile_picture', flat=True).iterator()
+        )
+        processed = skipped = failed = 0
+        for name in names:
+            expected = [
+                thumbnail_name(name, size, image_format)
+                for size in settings.PROFILE_PICTURE_THUMBNAIL_SIZES
+                for image_format in THUMBNAIL_FORMATS
+            ]
+            if not options['force'] and all(default_storage.exists(thumbnail) for thumbnail in expected):
+                skipped += 1
+                continue
+            try:
+                make_thumbnails(name)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Could not process {name}: {exc}")
+                continue
+            processed += 1
+        self.stdout.write(f"Processed {processed} pictures, skipped {skipped}, failed {failed}.")
@@ -0,0 +1,74 @@
+"""
+Management command that restores wraps from an NDJSON or CSV export.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from spotify_wrapped.exports import EXPORT_FORMATS, read_records, record_to_wrap
+from spotify_wrapped.models import ArchivedSpotifyWraps, SpotifyWraps, UserProfile
+
+
+class Command(BaseCommand):
+    """
+    Imports an export file into a user's account in batches, skipping wraps
+    the account already has so a restore can be re-run safely.
+    """
+    help = "Restores wraps from an NDJSON or CSV export into a user's account."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Export file produced by the wrap export download.")
+        parser.add_argument('--spotify-user-id', required=True, help="Spotify user id of the target account.")
+        parser.add_argument(
+            '--format', choices=list(EXPORT_FORMATS),
+            help="Format of the file; defaults to its extension.",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            user_profile = UserProfile.objects.get(spotify_user_id=options['spotify_user_id'])
+        except UserProfile.DoesNotExist:
+            raise CommandError(f"No user profile with Spotify user id {options['spotify_user_id']}.")
+        export_format = options['format'] or ('csv' if options['path'].endswith('.csv') else 'ndjson')
+
+        # Wraps are identified by their timeframe and creation time
+        existing = set(SpotifyWraps.objects.filter(user_profile=user_profile).values_list('length', 'date_time'))
+        existing.update(
+            ArchivedSpotifyWraps.objects.filter(user_profile=user_profile).values_list('length', 'date_time')
+        )
+
+        imported = skipped = 0
+        batch = []
+        with open(options['path'], newline='', encoding='utf-8') as export_file:
+            for record in read_records(export_file, export_format):
+                wrap = record_to_wrap(record, user_profile)
+                if (wrap.length, wrap.date_time) in existing:
+                    skipped += 1
+                    continue
+                existing.add((wrap.length, wrap.date_time))
+                batch.append(wrap)
+                if len(batch) >= options['batch_size']:
+                    imported += self.save_batch(batch)
+                    batch = []
+        if batch:
+            imported += self.save_batch(batch)
+        self.stdout.write(f"Imported {imported} wraps, skipped {skipped} already present.")
+
+    def save_batch(self, batch):
+        """
+        Inserts a batch of wraps, keeping their original creation times.
+
+        Args:
+            batch (list): Unsaved wraps.
+
+        Returns:
+            int: Number of wraps inserted.
+        """
+        # bulk_create applies auto_now_add, so the exported times are set back afterwards
+        date_times = [wrap.date_time for wrap in batch]
+        with transaction.atomic():
+            created = SpotifyWraps.objects.bulk_create(batch)
+            for wrap, date_time in zip(created, date_times):
+                wrap.date_time = date_time
+            SpotifyWraps.objects.bulk_update(created, ['date_time'])
+        return len(created)
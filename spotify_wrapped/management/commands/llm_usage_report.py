@@ -0,0 +1,95 @@
+"""
+Management command that rolls up LLM token usage and estimated cost.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from spotify_wrapped.models import LLMUsage
+
+GROUP_FIELDS = ['day', 'language', 'model']
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """
+    Estimates the cost of a number of tokens from LLM_TOKEN_PRICES, matching
+    dated model versions (e.g. gpt-3.5-turbo-0125) by their longest known prefix.
+
+    Args:
+        model (str): Model name reported by the API.
+        prompt_tokens (int): Number of prompt tokens.
+        completion_tokens (int): Number of completion tokens.
+
+    Returns:
+        float: Estimated cost in USD, or None if the model has no known price.
+    """
+    prices = settings.LLM_TOKEN_PRICES
+    matches = [name for name in prices if model.startswith(name)]
+    if not matches:
+        return None
+    prompt_price, completion_price = prices[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+class Command(BaseCommand):
+    """
+    Prints LLM generations, tokens, latency and estimated cost grouped by
+    day, language and/or model.
+    """
+    help = "Reports LLM token usage and estimated cost rolled up by day, language and model."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Only include the last N days.")
+        parser.add_argument(
+            '--group-by', nargs='+', choices=GROUP_FIELDS, default=GROUP_FIELDS,
+            help="Columns to roll up by.",
+        )
+
+    def handle(self, *args, **options):
+        group_by = options['group_by']
+        since = timezone.now() - timedelta(days=options['days'])
+        queryset = LLMUsage.objects.filter(created_at__gte=since)
+        if 'day' in group_by:
+            queryset = queryset.annotate(day=TruncDate('created_at'))
+
+        # Always group by model in SQL so each row can be priced, then merge
+        # the rows that share the requested columns
+        rows = (
+            queryset.values(*dict.fromkeys(group_by + ['model']))
+            .annotate(
+                generations=Count('id'),
+                prompt_tokens=Sum('prompt_tokens'),
+                completion_tokens=Sum('completion_tokens'),
+                total_latency_ms=Sum('latency_ms'),
+            )
+            .order_by(*group_by)
+        )
+        totals = {}
+        for row in rows:
+            total = totals.setdefault(tuple(str(row[name]) for name in group_by), {
+                'generations': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'total_latency_ms': 0, 'cost': 0.0, 'unpriced': False,
+            })
+            for field in ('generations', 'prompt_tokens', 'completion_tokens', 'total_latency_ms'):
+                total[field] += row[field]
+            cost = estimate_cost(row['model'], row['prompt_tokens'], row['completion_tokens'])
+            if cost is None:
+                total['unpriced'] = True
+            else:
+                total['cost'] += cost
+
+        self.stdout.write('\t'.join(group_by + [
+            'generations', 'prompt_tokens', 'completion_tokens', 'avg_latency_ms', 'est_cost_usd',
+        ]))
+        for key, total in totals.items():
+            # A trailing + marks costs that exclude models without a known price
+            self.stdout.write('\t'.join(list(key) + [
+                str(total['generations']),
+                str(total['prompt_tokens']),
+                str(total['completion_tokens']),
+                f"{total['total_latency_ms'] / total['generations']:.0f}",
+                f"{total['cost']:.4f}" + ('+' if total['unpriced'] else ''),
+            ]))
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bio', models.TextField(blank=True, null=True)),
+                ('profile_picture', models.ImageField(blank=True, null=True, upload_to='profile_pictures/')),
+                ('favorite_genres', models.CharField(blank=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('mode', models.CharField(blank=True, max_length=255, null=True)),
+                ('spotify_username', models.CharField(blank=True, max_length=255, null=True)),
+                ('spotify_user_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('spotify_access_token', models.CharField(blank=True, max_length=255, null=True)),
+                ('spotify_refresh_token', models.CharField(blank=True, max_length=255, null=True)),
+                ('token_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='userprofile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SpotifyWraps',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('top_songs', models.TextField(blank=True, default='[]')),
+                ('top_artists', models.TextField(blank=True, default='[]')),
+                ('top_genres', models.TextField(blank=True, default='[]')),
+                ('last_5_tracks', models.TextField(blank=True, default='[]')),
+                ('last_5_artists', models.TextField(blank=True, default='[]')),
+                ('date_time', models.DateTimeField(auto_now_add=True)),
+                ('length', models.CharField(blank=True, max_length=255, null=True)),
+                ('num_distinct_artists', models.SmallIntegerField(blank=True, null=True)),
+                ('num_genres', models.SmallIntegerField(blank=True, null=True)),
+                ('LLM_description_en', models.TextField(blank=True, null=True)),
+                ('LLM_description_az', models.TextField(blank=True, null=True)),
+                ('LLM_description_ru', models.TextField(blank=True, null=True)),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_wraps', to='spotify_wrapped.userprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spotify_wrapped', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSpotifyWraps',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_time', models.DateTimeField()),
+                ('length', models.CharField(blank=True, max_length=255, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_wraps', to='spotify_wrapped.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_profile', 'date_time'], name='spotify_wra_user_pr_0c1d36_idx')],
+            },
+        ),
+    ]
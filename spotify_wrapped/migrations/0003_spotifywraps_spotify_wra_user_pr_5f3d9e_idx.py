@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spotify_wrapped', '0002_archivedspotifywraps'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spotifywraps',
+            index=models.Index(fields=['user_profile', 'length', 'date_time'], name='spotify_wra_user_pr_5f3d9e_idx'),
+        ),
+    ]
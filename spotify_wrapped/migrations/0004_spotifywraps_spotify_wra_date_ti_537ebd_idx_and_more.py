@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:46
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spotify_wrapped', '0003_spotifywraps_spotify_wra_user_pr_5f3d9e_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spotifywraps',
+            index=models.Index(fields=['date_time'], name='spotify_wra_date_ti_537ebd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(django.db.models.functions.text.Upper('spotify_username'), name='userprofile_username_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(django.db.models.functions.text.Upper('spotify_user_id'), name='userprofile_user_id_upper_idx'),
+        ),
+    ]
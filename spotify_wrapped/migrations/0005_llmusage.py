@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spotify_wrapped', '0004_spotifywraps_spotify_wra_date_ti_537ebd_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('model', models.CharField(max_length=64)),
+                ('language', models.CharField(max_length=8)),
+                ('prompt_tokens', models.PositiveIntegerField()),
+                ('completion_tokens', models.PositiveIntegerField()),
+                ('latency_ms', models.PositiveIntegerField()),
+                ('user_profile', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_usage', to='spotify_wrapped.userprofile')),
+                ('wrap', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='llm_usage', to='spotify_wrapped.spotifywraps')),
+            ],
+        ),
+    ]
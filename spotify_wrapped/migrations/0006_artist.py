@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spotify_wrapped', '0005_llmusage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Artist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spotify_id', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('genres', models.TextField(blank=True, default='[]')),
+                ('images', models.TextField(blank=True, default='[]')),
+                ('popularity', models.SmallIntegerField(blank=True, null=True)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spotify_wrapped', '0007_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spotifywraps',
+            name='scheduled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -2,8 +2,13 @@
 Models for user profiles and Spotify wrapped features.
 """
 import json
+import zlib
+
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models.functions import Upper
+
+from .thumbnails import schedule_thumbnails, thumbnail_name
 
 
 class UserProfile(models.Model):
@@ -23,8 +28,37 @@ class UserProfile(models.Model):
     spotify_refresh_token = models.CharField(max_length=255, blank=True, null=True)
     token_expires_at = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        # Match the case-insensitive exact searches in UserProfileAdmin
+        indexes = [
+            models.Index(Upper('spotify_username'), name='userprofile_username_upper_idx'),
+            models.Index(Upper('spotify_user_id'), name='userprofile_user_id_upper_idx'),
+        ]
+
     def __str__(self):
-        return self.spotify_username
+        return self.spotify_username or f"UserProfile {self.pk}"
+
+    def save(self, *args, **kwargs):
+        # A picture that is not committed to storage yet is a new upload
+        new_picture = bool(self.profile_picture) and not self.profile_picture._committed
+        super().save(*args, **kwargs)
+        if new_picture:
+            schedule_thumbnails(self.profile_picture)
+
+    def avatar_url(self, size=64, image_format='webp'):
+        """
+        Returns the URL of a profile picture thumbnail.
+
+        Args:
+            size (int): One of PROFILE_PICTURE_THUMBNAIL_SIZES.
+            image_format (str): 'webp' or 'jpeg'.
+
+        Returns:
+            str: The thumbnail's URL, or None without a profile picture.
+        """
+        if not self.profile_picture:
+            return None
+        return self.profile_picture.storage.url(thumbnail_name(self.profile_picture.name, size, image_format))
 
 
 class SpotifyWraps(models.Model):
@@ -44,4 +78,135 @@ class SpotifyWraps(models.Model):
     num_genres = models.SmallIntegerField(blank=True, null=True)
     LLM_description_en = models.TextField(blank=True, null=True)
     LLM_description_az = models.TextField(blank=True, null=True)
-    LLM_description_ru = models.TextField(blank=True, null=True)
\ No newline at end of file
+    LLM_description_ru = models.TextField(blank=True, null=True)
+    scheduled = models.BooleanField(default=False)  # Precomputed off-peak
+
+    archived = False
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_profile', 'length', 'date_time']),
+            models.Index(fields=['date_time']),
+        ]
+
+class ArchivedSpotifyWraps(models.Model):
+    """
+    Model to store old spotify wraps in compact form.
+    Only the fields needed to list a wrap are kept as columns; everything else
+    is stored as zlib-compressed JSON in a single binary payload.
+    """
+    PAYLOAD_FIELDS = [
+        'top_songs', 'top_artists', 'top_genres', 'last_5_tracks', 'last_5_artists',
+        'num_distinct_artists', 'num_genres',
+        'LLM_description_en', 'LLM_description_az', 'LLM_description_ru',
+    ]
+
+    id = models.BigIntegerField(primary_key=True)  # Same id as the original wrap
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='archived_wraps')
+    date_time = models.DateTimeField()
+    length = models.CharField(max_length=255, blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        indexes = [models.Index(fields=['user_profile', 'date_time'])]
+
+    @classmethod
+    def compress(cls, wrap):
+        """
+        Compresses the payload fields of a wrap.
+
+        Args:
+            wrap (SpotifyWraps): The wrap to compress.
+
+        Returns:
+            bytes: The compressed payload.
+        """
+        payload = {field: getattr(wrap, field) for field in cls.PAYLOAD_FIELDS}
+        return zlib.compress(json.dumps(payload).encode(), 9)
+
+    @classmethod
+    def from_wrap(cls, wrap):
+        """
+        Builds an archived copy of a wrap.
+
+        Args:
+            wrap (SpotifyWraps): The wrap to archive.
+
+        Returns:
+            ArchivedSpotifyWraps: The unsaved archived wrap.
+        """
+        return cls(
+            id=wrap.id,
+            user_profile_id=wrap.user_profile_id,
+            date_time=wrap.date_time,
+            length=wrap.length,
+            payload=cls.compress(wrap),
+        )
+
+    def to_wrap(self):
+        """
+        Rebuilds the original wrap so it can be viewed like a live one.
+
+        Returns:
+            SpotifyWraps: An unsaved wrap with 'archived' set to True.
+        """
+        wrap = SpotifyWraps(
+            id=self.id,
+            user_profile_id=self.user_profile_id,
+            date_time=self.date_time,
+            length=self.length,
+            **json.loads(zlib.decompress(bytes(self.payload))),
+        )
+        wrap.archived = True
+        return wrap
+
+
+class LLMUsage(models.Model):
+    """
+    Model to store the token usage of a single LLM generation.
+    The wrap link has no database constraint so usage history survives wraps
+    being archived (which keeps their id) or deleted.
+    """
+    wrap = models.ForeignKey(
+        SpotifyWraps, on_delete=models.DO_NOTHING, db_constraint=False, related_name='llm_usage'
+    )
+    user_profile = models.ForeignKey(
+        UserProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='llm_usage'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    model = models.CharField(max_length=64)
+    language = models.CharField(max_length=8)
+    prompt_tokens = models.PositiveIntegerField()
+    completion_tokens = models.PositiveIntegerField()
+    latency_ms = models.PositiveIntegerField()
+
+
+class Artist(models.Model):
+    """
+    Model to store Spotify artist metadata shared by all users.
+    Rows are refreshed from Spotify once they are older than
+    ARTIST_METADATA_MAX_AGE_DAYS.
+    """
+    spotify_id = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255)
+    genres = models.TextField(blank=True, default="[]")  # Store as JSON string
+    images = models.TextField(blank=True, default="[]")  # Store as JSON string
+    popularity = models.SmallIntegerField(blank=True, null=True)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.name
+
+
+class Checkpoint(models.Model):
+    """
+    Model to store the progress of a resumable batch job as the last
+    processed id, so a crashed run can continue where it stopped.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.last_id}"
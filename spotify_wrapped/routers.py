@@ -0,0 +1,103 @@
+"""
+Database router that sends read-only wrap and profile queries to a replica.
+"""
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Models whose reads may be served by the replica
+REPLICA_MODELS = {
+    'spotify_wrapped.userprofile',
+    'spotify_wrapped.spotifywraps',
+    'spotify_wrapped.archivedspotifywraps',
+}
+
+# Cookie telling later requests that this client wrote recently
+PIN_COOKIE_NAME = 'db_pin_primary'
+
+_pinned_until = ContextVar('primary_pinned_until', default=0.0)
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def pin_primary(seconds=None):
+    """
+    Sends reads of the routed models to the primary for the next few seconds,
+    so a client reads its own writes despite replication lag.
+
+    Args:
+        seconds (float): Length of the window, defaulting to REPLICA_PIN_SECONDS.
+    """
+    if seconds is None:
+        seconds = settings.REPLICA_PIN_SECONDS
+    _pinned_until.set(time.monotonic() + seconds)
+
+
+def unpin_primary():
+    """
+    Ends any read-your-writes window in the current context.
+    """
+    _pinned_until.set(0.0)
+    _wrote.set(False)
+
+
+def is_pinned():
+    """
+    Returns whether reads are currently pinned to the primary.
+
+    Returns:
+        bool: True inside a read-your-writes window.
+    """
+    return time.monotonic() < _pinned_until.get()
+
+
+class PrimaryReplicaRouter:
+    """
+    Routes reads of wraps and profiles to DATABASE_REPLICA_ALIAS and all
+    writes to the primary. Without a configured replica every query goes to
+    the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = settings.DATABASE_REPLICA_ALIAS
+        if alias and model._meta.label_lower in REPLICA_MODELS and not is_pinned():
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if model._meta.label_lower in REPLICA_MODELS:
+            pin_primary()
+            _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+
+class ReplicaPinningMiddleware:
+    """
+    Carries the read-your-writes window across requests with a short-lived
+    cookie, so the request after a write (e.g. the redirect after creating a
+    wrap) also reads from the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_token = _pinned_until.set(0.0)
+        wrote_token = _wrote.set(False)
+        if PIN_COOKIE_NAME in request.COOKIES:
+            pin_primary()
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                response.set_cookie(
+                    PIN_COOKIE_NAME, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+                )
+            return response
+        finally:
+            _pinned_until.reset(pinned_token)
+            _wrote.reset(wrote_token)
@@ -0,0 +1,130 @@
+"""
+Downscaling and thumbnails of uploaded profile pictures.
+
+Pillow is only imported when an image is processed, keeping it out of
+worker start-up.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+# Pillow format and file extension of each thumbnail format
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+# Uploads over PROFILE_PICTURE_INLINE_MAX_BYTES are processed here instead
+# of in the request that saved them
+THUMBNAIL_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbnails')
+
+
+def thumbnail_name(name, size, image_format):
+    """
+    Returns the storage name of a thumbnail, next to its original.
+
+    Args:
+        name (str): Storage name of the original picture.
+        size (int): Width and height of the thumbnail in pixels.
+        image_format (str): One of the THUMBNAIL_FORMATS keys.
+
+    Returns:
+        str: The thumbnail's storage name, e.g. 'profile_pictures/me_128.webp'.
+    """
+    root, _ext = os.path.splitext(name)
+    return f"{root}_{size}.{THUMBNAIL_FORMATS[image_format][1]}"
+
+
+def _replace(storage, name, content):
+    # Storage.save() renames on conflicts, so remove the old file first
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def _flatten(image):
+    """
+    Composites a transparent image onto white for formats without alpha, so
+    transparent pixels do not turn black.
+
+    Args:
+        image (Image): An RGB or RGBA image.
+
+    Returns:
+        Image: The RGB image.
+    """
+    from PIL import Image
+
+    if image.mode != 'RGBA':
+        return image
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def make_thumbnails(name, storage=default_storage):
+    """
+    Downscales an uploaded picture to PROFILE_PICTURE_MAX_DIMENSION and writes
+    square WebP and JPEG thumbnails of every PROFILE_PICTURE_THUMBNAIL_SIZES
+    size next to it. Images are re-encoded from pixels only, which strips
+    EXIF and other metadata after applying the EXIF orientation.
+
+    Args:
+        name (str): Storage name of the original picture.
+        storage (Storage): Storage holding the picture.
+    """
+    from PIL import Image, ImageOps
+
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        original_format = image.format or 'JPEG'
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    # Drop metadata so it is not written back out
+    for key in ('exif', 'xmp', 'XML:com.adobe.xmp'):
+        image.info.pop(key, None)
+    if image.mode not in ('RGB', 'RGBA'):
+        # Palette and grayscale images may carry transparency outside an alpha band
+        transparent = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if transparent else 'RGB')
+
+    max_dimension = settings.PROFILE_PICTURE_MAX_DIMENSION
+    image.thumbnail((max_dimension, max_dimension))
+    buffer = io.BytesIO()
+    image.save(buffer, original_format, quality=90)
+    _replace(storage, name, buffer.getvalue())
+
+    for size in settings.PROFILE_PICTURE_THUMBNAIL_SIZES:
+        thumbnail = ImageOps.fit(image, (size, size))
+        for image_format, (pillow_format, _ext) in THUMBNAIL_FORMATS.items():
+            output = _flatten(thumbnail) if pillow_format == 'JPEG' else thumbnail
+            buffer = io.BytesIO()
+            output.save(buffer, pillow_format, quality=80)
+            _replace(storage, thumbnail_name(name, size, image_format), buffer.getvalue())
+
+
+def _make_thumbnails_logged(name):
+    try:
+        make_thumbnails(name)
+    except Exception:
+        logger.exception("Could not process profile picture %s", name)
+
+
+def schedule_thumbnails(field_file):
+    """
+    Processes a newly uploaded picture, in the background if it is large.
+
+    Args:
+        field_file (FieldFile): The saved profile picture.
+    """
+    if field_file.size <= settings.PROFILE_PICTURE_INLINE_MAX_BYTES:
+        _make_thumbnails_logged(field_file.name)
+    else:
+        THUMBNAIL_EXECUTOR.submit(_make_thumbnails_logged, field_file.name)
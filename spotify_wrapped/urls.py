@@ -10,6 +10,9 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('wraps/', views.wraps_view, name='wraps_view'),
     path('wraps/delete/<int:wrap_id>/', views.delete_wrap, name='delete_wrap'),
+    path('wraps/card/<int:wrap_id>/', views.wrap_card, name='wrap_card'),
+    path('wraps/export/', views.export_wraps, name='export_wraps'),
+    path('wraps/slides/<int:wrap_id>/', views.wrap_slides, name='wrap_slides'),
     path('wraps/<int:page_num>/', views.view_wrap, name='view_wrap'),
     path('wraps/<int:page_num>/<int:wrap_id>/', views.view_wrap, name='view_wrap_with_id'),
     path('wrap_base/', views.wrap_base, name='wrap_base'),
@@ -29,5 +32,6 @@ urlpatterns = [
     path('set_language/', set_language, name='set_language'),
     path('delete-account/', views.delete_account, name='delete_account'),
     path('set-theme/<str:theme_name>/', views.set_theme, name='set_theme'),
+    path('status/upstreams/', views.upstream_status, name='upstream_status'),
 
 ]
\ No newline at end of file
@@ -4,9 +4,10 @@ Utility functions for Spotify OAuth and token management.
 import base64
 from datetime import datetime, timedelta
 
-import requests
 from django.conf import settings
 
+from .clients import get_http_session
+
 # Spotify Token URL
 SPOTIFY_TOKEN_URL = 'https://accounts.spotify.com/api/token'
 
@@ -46,7 +47,7 @@ def refresh_spotify_token(user_profile):
         'refresh_token': user_profile.spotify_refresh_token
     })
 
-    response = requests.post(SPOTIFY_TOKEN_URL, headers=headers, data=data, timeout=10)
+    response = get_http_session().post(SPOTIFY_TOKEN_URL, headers=headers, data=data, timeout=10)
     if response.status_code != 200:
         return False
 
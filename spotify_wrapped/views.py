@@ -2,25 +2,40 @@
 Views for handling user authentication, Spotify integration, and app functionality.
 """
 import collections
+import hashlib
 import os
+import threading
+import time
 import base64
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import timedelta
 import json
 
-import requests
-from django.http import JsonResponse
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.conf import settings
 from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.contrib.auth.models import User
+from django.contrib.admin.views.decorators import staff_member_required
+from django.template.loader import render_to_string
 from django.template.response import TemplateResponse
-from django.utils import timezone
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone, translation
 from django.core.mail import send_mail
-from openai import OpenAI
 
-from .models import UserProfile, SpotifyWraps
+from .breakers import BREAKERS, UpstreamError, UpstreamRejectedError, openai_breaker, spotify_breaker
+from .cards import CARD_FORMATS, delete_wrap_cards, open_wrap_card
+from .clients import get_http_session, get_openai_client
+from .exports import EXPORT_FORMATS, iter_csv, iter_ndjson, iter_user_wraps
+from .models import Artist, ArchivedSpotifyWraps, LLMUsage, UserProfile, SpotifyWraps
 from .utils import get_spotify_auth_headers
 
 
@@ -31,8 +46,45 @@ SPOTIFY_TOKEN_URL = 'https://accounts.spotify.com/api/token'
 SPOTIFY_API_BASE_URL = 'https://api.spotify.com/v1'
 SPOTIFY_SCOPE = 'user-top-read user-read-recently-played'
 
-session = requests.Session()
-session.verify = False
+# Spotify time_range for each wrap timeframe
+TIME_RANGES = {
+    "1 month": "short_term",
+    "1 year": "medium_term",
+    "5 years": "long_term",
+}
+
+# Maximum number of ids per /artists request
+ARTIST_BATCH_SIZE = 50
+
+# Post-login prefetches run on a small thread pool; logins that find every
+# slot busy skip the prefetch instead of queueing behind it
+PREFETCH_SLOTS = threading.BoundedSemaphore(settings.SPOTIFY_PREFETCH_WORKERS)
+PREFETCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.SPOTIFY_PREFETCH_WORKERS, thread_name_prefix='spotify-prefetch'
+)
+
+# Templates of the wrap walkthrough slides, by page number; each renders the
+# slide of the same name under slides/
+WRAP_TEMPLATES = [
+    'wrap_base.html',
+    'wrap1.html',
+    'wrap2.html',
+    'wrap3.html',
+    'wrap4.html',
+    'wrap5.html',
+    'wrap6.html',
+    'wrap7.html',
+]
+
+# Wrap slide that shows the LLM description
+DESCRIPTION_PAGE = 7
+# Page of the validators of the response holding every slide
+ALL_SLIDES = 'all'
+# A description generation claim outlives the OpenAI timeout by this much
+DESCRIPTION_CLAIM_MARGIN_SECONDS = 5
+# How often viewers waiting for another caller's description re-read it
+DESCRIPTION_WAIT_INTERVAL_SECONDS = 0.5
+WRAP_DESCRIPTION_MODEL = "gpt-3.5-turbo"
 
 def index(request):
     """
@@ -44,11 +96,7 @@ def index(request):
     Returns:
         HttpResponse: Rendered homepage.
     """
-
-    context = None
-    if request.user.is_authenticated:
-        context = {'spotify_username': request.user.userprofile.spotify_username}
-    return render(request, 'index.html', context)
+    return render(request, 'index.html')
 
 def wrap_base(request):
     """
@@ -60,7 +108,7 @@ def wrap_base(request):
     Returns:
         HttpResponse: Rendered wrap_base page.
     """
-    return render(request, 'wrap_base.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap_base.html')
 
 def wrap1(request):
     """
@@ -72,7 +120,7 @@ def wrap1(request):
     Returns:
         HttpResponse: Rendered wrap1 page.
     """
-    return render(request, 'wrap1.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap1.html')
 
 def wrap2(request):
     """
@@ -84,7 +132,7 @@ def wrap2(request):
     Returns:
         HttpResponse: Rendered wrap2 page.
     """
-    return render(request, 'wrap2.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap2.html')
 
 def wrap3(request):
     """
@@ -96,7 +144,7 @@ def wrap3(request):
     Returns:
         HttpResponse: Rendered wrap3 page.
     """
-    return render(request, 'wrap3.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap3.html')
 
 def wrap4(request):
     """
@@ -108,7 +156,7 @@ def wrap4(request):
     Returns:
         HttpResponse: Rendered wrap4 page.
     """
-    return render(request, 'wrap4.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap4.html')
 
 def wrap5(request):
     """
@@ -120,7 +168,7 @@ def wrap5(request):
     Returns:
         HttpResponse: Rendered wrap5 page.
     """
-    return render(request, 'wrap5.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap5.html')
 
 def wrap6(request):
     """
@@ -132,7 +180,7 @@ def wrap6(request):
     Returns:
         HttpResponse: Rendered wrap6 page.
     """
-    return render(request, 'wrap6.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap6.html')
 
 def wrap7(request):
     """
@@ -144,7 +192,7 @@ def wrap7(request):
     Returns:
         HttpResponse: Rendered wrap7 page.
     """
-    return render(request, 'wrap7.html', {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, 'wrap7.html')
 
 def login_view(request):
     """
@@ -216,7 +264,7 @@ def fetch_spotify_token(data, headers):
     Returns:
         response: spotify response info in json format.
     """
-    response = requests.post(SPOTIFY_TOKEN_URL, headers=headers, data=data, timeout=10)
+    response = get_http_session().post(SPOTIFY_TOKEN_URL, headers=headers, data=data, timeout=10)
     if response.status_code != 200:
         return None
     return response.json()
@@ -232,11 +280,36 @@ def fetch_spotify_user_info(access_token):
         response: spotify response info in json format.
     """
     headers = {'Authorization': f'Bearer {access_token}'}
-    response = requests.get(f"{SPOTIFY_API_BASE_URL}/me", headers=headers, timeout=10)
+    try:
+        response = spotify_get(f"{SPOTIFY_API_BASE_URL}/me", headers)
+    except UpstreamError:
+        return None
     if response.status_code != 200:
         return None
     return response.json()
 
+def spotify_get(url, headers):
+    """
+    Calls the Spotify Web API through its circuit breaker. Timeouts,
+    connection errors, rate limiting and server errors count as failures.
+
+    Args:
+        url (str): The API URL.
+        headers (dict): Request headers, including the bearer token.
+
+    Returns:
+        Response: The Spotify response.
+
+    Raises:
+        UpstreamError: If Spotify failed or its breaker is open.
+    """
+    def request():
+        response = get_http_session().get(url, headers=headers, timeout=settings.SPOTIFY_TIMEOUT_SECONDS)
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        return response
+    return spotify_breaker.call(request)
+
 def spotify_callback(request):
     """
     Handles Spotify's OAuth callback to exchange a code for access and refresh tokens.
@@ -288,16 +361,17 @@ def spotify_callback(request):
         user.email = internal_email
         user.save()
 
-    login(request, user)
+    login(request, user, backend='spotify_wrapped.backends.UserProfileBackend')
 
     # Create or update user profile using Spotify details
-    user_profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    user_profile, _ = UserProfile.objects.get_or_create(user=user)
     user_profile.spotify_username = spotify_username
     user_profile.spotify_user_id = spotify_user_id
     user_profile.spotify_access_token = access_token
     user_profile.spotify_refresh_token = refresh_token
     user_profile.token_expires_at = expires_at
     user_profile.save()
+    start_top_items_prefetch(user_profile.id, access_token)
 
     messages.success(request, f"Logged in as {spotify_username}")
 
@@ -314,8 +388,6 @@ def contact_view(request):
         HttpResponse: Rendered contact page with success or error message.
     """
     context = {}
-    if request.user.is_authenticated:
-        context = {'spotify_username': request.user.userprofile.spotify_username}
     if request.method == 'POST':
         subject = request.POST.get('subject')
         message = request.POST.get('message')
@@ -340,7 +412,7 @@ def settings_view(request):
     Returns:
         HttpResponse: Rendered settings page.
     """
-    return render(request, "settings.html", {'spotify_username': request.user.userprofile.spotify_username})
+    return render(request, "settings.html")
 
 def wraps_view(request):
     """
@@ -352,12 +424,36 @@ def wraps_view(request):
     Returns:
         HttpResponse: Rendered wraps page with all wraps.
     """
-    user_profile = UserProfile.objects.get(user=request.user)
-    token = user_profile.spotify_access_token
+    user_profile = request.user.userprofile
+
+    # Fetch saved and archived wraps for the current user in one query
+    wraps = SpotifyWraps.objects.filter(user_profile=user_profile).values('id', 'date_time', 'length').union(
+        ArchivedSpotifyWraps.objects.filter(user_profile=user_profile).values('id', 'date_time', 'length'),
+        all=True,
+    ).order_by("-date_time")
+    return render(request, 'wraps.html', {'all_wraps': wraps})
+
+def export_wraps(request):
+    """
+    Streams the logged-in user's full wrap history as a download, reading and
+    writing one chunk of rows at a time.
+
+    Args:
+        request (HttpRequest): The request object. The optional 'format'
+            query parameter selects 'ndjson' (default) or 'csv'.
+
+    Returns:
+        StreamingHttpResponse: The export file, or a 400 JSON error.
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"error": "Unsupported format."}, status=400)
 
-    # Fetch saved wraps for the current user
-    wraps = SpotifyWraps.objects.filter(user_profile=user_profile).order_by("-date_time")
-    return render(request, 'wraps.html', {'all_wraps': wraps, 'spotify_username': request.user.userprofile.spotify_username})
+    wraps = iter_user_wraps(request.user.userprofile)
+    rows = iter_csv(wraps) if export_format == 'csv' else iter_ndjson(wraps)
+    response = StreamingHttpResponse(rows, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="wraps.{export_format}"'
+    return response
 
 def delete_wrap(request, wrap_id):
     """
@@ -369,14 +465,160 @@ def delete_wrap(request, wrap_id):
     Returns:
         HttpResponse: Rendered wraps page with deleting the specific wrap.
     """
+    deleted, _ = SpotifyWraps.objects.filter(id=wrap_id, user_profile__user=request.user).delete()
+    if not deleted:
+        deleted, _ = ArchivedSpotifyWraps.objects.filter(id=wrap_id, user_profile__user=request.user).delete()
+    if not deleted:
+        return JsonResponse({"error": "Wrap not found."}, status=404)
+    delete_wrap_cards(wrap_id)
+    return JsonResponse({"message": "Wrap deleted successfully."})
+
+def get_saved_wrap(wrap_id, user_profile):
+    """
+    Fetches a saved wrap, falling back to the archive for old wraps.
+
+    Args:
+        wrap_id (int): The wrap's id.
+        user_profile (UserProfile): The owner of the wrap.
+
+    Returns:
+        SpotifyWraps: The wrap; archived wraps are rebuilt and have 'archived' set.
+
+    Raises:
+        SpotifyWraps.DoesNotExist: If the user has no such wrap.
+    """
     try:
-        wrap = SpotifyWraps.objects.get(id=wrap_id, user_profile__user=request.user)
-        wrap.delete()
-        return JsonResponse({"message": "Wrap deleted successfully."})
+        return SpotifyWraps.objects.get(id=wrap_id, user_profile=user_profile)
     except SpotifyWraps.DoesNotExist:
-        return JsonResponse({"error": "Wrap not found."}, status=404)
+        archived = ArchivedSpotifyWraps.objects.filter(id=wrap_id, user_profile=user_profile).first()
+        if archived is None:
+            raise
+        return archived.to_wrap()
+
+
+def _saved_wrap_state(request, wrap_id):
+    """
+    Looks up the creation time and the active-language description of a
+    saved wrap once per request, so the ETag and Last-Modified checks share a
+    single lightweight query.
+
+    Args:
+        request (HttpRequest): The request object.
+        wrap_id (int): The wrap's id, or -1 when a new wrap is being created.
+
+    Returns:
+        tuple: The wrap's date_time and description, or None if there is no
+            saved wrap.
+    """
+    if wrap_id == -1 or not request.user.is_authenticated:
+        return None
+    if not hasattr(request, '_saved_wrap_state'):
+        user_profile = request.user.userprofile
+        field = f'LLM_description_{get_wrap_language()}'
+        state = SpotifyWraps.objects.filter(
+            id=wrap_id, user_profile=user_profile
+        ).values_list('date_time', field).first()
+        if state is None:
+            archived = ArchivedSpotifyWraps.objects.filter(id=wrap_id, user_profile=user_profile).first()
+            if archived is not None:
+                wrap = archived.to_wrap()
+                state = (wrap.date_time, getattr(wrap, field))
+        request._saved_wrap_state = state
+    return request._saved_wrap_state
+
+def _saved_wrap_date_time(request, wrap_id, page_num):
+    """
+    Returns the creation time of a saved wrap whose slide can be revalidated.
+    Slides showing the description get no validators while it is missing:
+    the placeholder must not be cached, or a revalidation would skip the view
+    that generates the description.
+
+    Args:
+        request (HttpRequest): The request object.
+        wrap_id (int): The wrap's id.
+        page_num: The slide's page number, or ALL_SLIDES.
+
+    Returns:
+        datetime: The wrap's date_time, or None if the slide cannot be revalidated.
+    """
+    state = _saved_wrap_state(request, wrap_id)
+    if state is None:
+        return None
+    date_time, description = state
+    if page_num in (DESCRIPTION_PAGE, ALL_SLIDES) and not description:
+        return None
+    return date_time
+
+def saved_wrap_etag(request, page_num=0, wrap_id=-1):
+    """
+    Computes the ETag of a saved wrap slide. Saved wraps never change apart
+    from their description, so the slide only depends on the wrap, its
+    description, the page, the language and the theme.
+
+    Args:
+        request (HttpRequest): The request object.
+
+    Returns:
+        str: The ETag, or None if the request is not for a saved wrap or the
+            slide's description has not been generated yet.
+    """
+    date_time = _saved_wrap_date_time(request, wrap_id, page_num)
+    if date_time is None:
+        return None
+    _date_time, description = _saved_wrap_state(request, wrap_id)
+    key = ':'.join([
+        str(wrap_id),
+        date_time.isoformat(),
+        str(page_num),
+        translation.get_language() or '',
+        request.session.get('theme', ''),
+        request.user.userprofile.spotify_username or '',
+        description or '',
+    ])
+    return hashlib.md5(key.encode()).hexdigest()
+
+def saved_wrap_last_modified(request, page_num=0, wrap_id=-1):
+    """
+    Returns the Last-Modified time of a saved wrap slide.
+
+    Args:
+        request (HttpRequest): The request object.
+
+    Returns:
+        datetime: The wrap's creation time, or None if not a saved wrap or
+            the slide's description has not been generated yet.
+    """
+    return _saved_wrap_date_time(request, wrap_id, page_num)
+
+def wrap_slides_etag(request, wrap_id):
+    """
+    Computes the ETag of all of a saved wrap's slides.
+
+    Args:
+        request (HttpRequest): The request object.
+        wrap_id (int): The wrap's id.
+
+    Returns:
+        str: The ETag, or None if the slides cannot be revalidated.
+    """
+    return saved_wrap_etag(request, ALL_SLIDES, wrap_id)
+
+def wrap_slides_last_modified(request, wrap_id):
+    """
+    Returns the Last-Modified time of all of a saved wrap's slides.
+
+    Args:
+        request (HttpRequest): The request object.
+        wrap_id (int): The wrap's id.
+
+    Returns:
+        datetime: The wrap's creation time, or None if the slides cannot be revalidated.
+    """
+    return saved_wrap_last_modified(request, ALL_SLIDES, wrap_id)
 
 
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=saved_wrap_etag, last_modified_func=saved_wrap_last_modified)
 def view_wrap(request, page_num=0, wrap_id=-1):
     """
     Views a specific Spotify wrap associated with the logged-in user.
@@ -387,26 +629,73 @@ def view_wrap(request, page_num=0, wrap_id=-1):
     Returns:
         HttpResponse: Rendered the specific wrap presentation slides.
     """
-    user_profile = UserProfile.objects.get(user=request.user)
+    user_profile = request.user.userprofile
     timeframe = request.GET.get("timeframe")
     # wrap_id = request.GET.get("wrap_id")
 
     if wrap_id != -1:
         try:
-            wrap = SpotifyWraps.objects.get(id=wrap_id, user_profile=user_profile)
+            wrap = get_saved_wrap(wrap_id, user_profile)
         except SpotifyWraps.DoesNotExist:
             messages.error(request, "Wrap not found.")
             return redirect('wraps_view')
     elif timeframe:
-        # Create a new wrap for the specified timeframe
-        wrap = create_wrap_for_timeframe(user_profile, timeframe)
+        # Create a new wrap for the specified timeframe, or reuse a recent one
+        try:
+            wrap, _created = get_or_create_wrap_for_timeframe(user_profile, timeframe)
+        except UpstreamRejectedError:
+            messages.error(request, "Spotify rejected the request. Please log in again.")
+            return redirect('wraps_view')
+        except UpstreamError:
+            messages.error(request, "Spotify is unavailable right now. Please try again in a few minutes.")
+            return redirect('wraps_view')
     else:
         messages.error(request, "Invalid request.")
         return redirect('wraps_view')
 
-    # Prepare context
-    context = {
-        'spotify_username': request.user.userprofile.spotify_username,
+    if page_num == DESCRIPTION_PAGE:
+        ensure_wrap_description(wrap, get_wrap_language())
+
+    return TemplateResponse(request, WRAP_TEMPLATES[page_num], wrap_slide_context(wrap, page_num))
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=wrap_slides_etag, last_modified_func=wrap_slides_last_modified)
+def wrap_slides(request, wrap_id):
+    """
+    Renders every slide of a saved wrap in one response, so the walkthrough
+    can switch slides in the browser instead of requesting each page.
+
+    Args:
+        request (HttpRequest): The request object.
+        wrap_id (int): The wrap's id.
+
+    Returns:
+        JsonResponse: Slide HTML keyed by the slide's page URL, or a 404 JSON error.
+    """
+    try:
+        wrap = get_saved_wrap(wrap_id, request.user.userprofile)
+    except SpotifyWraps.DoesNotExist:
+        return JsonResponse({"error": "Wrap not found."}, status=404)
+    ensure_wrap_description(wrap, get_wrap_language())
+
+    slides = {}
+    for page_num, template in enumerate(WRAP_TEMPLATES):
+        url = reverse('view_wrap_with_id', kwargs={'page_num': page_num, 'wrap_id': wrap.id})
+        slides[url] = render_to_string(f'slides/{template}', wrap_slide_context(wrap, page_num), request=request)
+    return JsonResponse({"slides": slides})
+
+def wrap_slide_context(wrap, page_num):
+    """
+    Builds the template context of a wrap slide.
+
+    Args:
+        wrap (SpotifyWraps): The wrap being viewed.
+        page_num (int): The slide's page number.
+
+    Returns:
+        dict: The slide's template context.
+    """
+    return {
         'length': wrap.length,
         'date_time': wrap.date_time,
         'top_songs': json.loads(wrap.top_songs),
@@ -422,27 +711,265 @@ def view_wrap(request, page_num=0, wrap_id=-1):
     }
 
 
+@contextmanager
+def wrap_creation_lock(user_profile, timeframe):
+    """
+    Holds a transaction-scoped lock on (user, timeframe) so concurrent requests
+    for the same wrap, from any worker, check for and insert it one at a time.
+    Keep the block short: no upstream calls should run while it is held.
+
+    On PostgreSQL this is an advisory lock; other databases lock the user's
+    profile row instead.
 
-    # Templates for wrap pages
-    wrap_templates = [
-        'wrap_base.html',
-        'wrap1.html',
-        'wrap2.html',
-        'wrap3.html',
-        'wrap4.html',
-        'wrap5.html',
-        'wrap6.html',
-        'wrap7.html',
-    ]
-    template = wrap_templates[page_num]
+    Args:
+        user_profile (UserProfile): The user's profile.
+        timeframe (str): The time range for the wrap.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            digest = hashlib.blake2b(f"wrap:{user_profile.id}:{timeframe}".encode(), digest_size=8).digest()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [int.from_bytes(digest, 'big', signed=True)])
+        else:
+            list(UserProfile.objects.select_for_update().filter(pk=user_profile.pk).values_list('pk'))
+        yield
+
+def get_recent_wrap(user_profile, timeframe, using=None):
+    """
+    Returns the user's newest wrap for a timeframe created within the last
+    WRAP_IDEMPOTENCY_MINUTES, or within the last WRAP_SCHEDULED_REUSE_HOURS
+    for wraps precomputed off-peak.
+
+    Args:
+        user_profile (UserProfile): The user's profile.
+        timeframe (str): The time range for the wrap.
+        using (str): Database alias to read from; by default the router
+            picks one, which may be a lagging replica.
+
+    Returns:
+        SpotifyWraps: The recent wrap, or None if there is none.
+    """
+    now = timezone.now()
+    since = now - timedelta(minutes=settings.WRAP_IDEMPOTENCY_MINUTES)
+    scheduled_since = now - timedelta(hours=settings.WRAP_SCHEDULED_REUSE_HOURS)
+    return SpotifyWraps.objects.db_manager(using).filter(
+        Q(date_time__gte=since) | Q(scheduled=True, date_time__gte=scheduled_since),
+        user_profile=user_profile, length=timeframe,
+    ).order_by('-date_time').first()
+
+def get_or_create_wrap_for_timeframe(user_profile, timeframe, scheduled=False):
+    """
+    Returns the user's recent wrap for a timeframe (see get_recent_wrap),
+    creating one if there is none. Duplicate requests (double clicks, browser
+    retries) reuse the first saved wrap instead of creating another, and
+    peak-hour requests reuse the wrap precomputed off-peak.
+
+    The Spotify and OpenAI calls run outside wrap_creation_lock, which only
+    covers the re-check and the insert; concurrent duplicates may both fetch
+    from Spotify, but only one wrap is saved.
 
-    return TemplateResponse(request, template, context)
+    Args:
+        user_profile (UserProfile): The user's profile.
+        timeframe (str): The time range for the wrap.
+        scheduled (bool): Whether a created wrap is precomputed off-peak and
+            reused for WRAP_SCHEDULED_REUSE_HOURS.
 
+    Returns:
+        tuple: The recent or newly created wrap, and whether it was created.
+
+    Raises:
+        UpstreamError: If Spotify failed or its breaker is open.
+        UpstreamRejectedError: If Spotify rejected the user's token.
+    """
+    wrap = get_recent_wrap(user_profile, timeframe)
+    if wrap is not None:
+        return wrap, False
+    fields = fetch_wrap_fields(user_profile, timeframe)
+    with wrap_creation_lock(user_profile, timeframe):
+        # Re-check on the primary: a wrap another request just committed may
+        # not have reached the replica yet
+        wrap = get_recent_wrap(user_profile, timeframe, using=DEFAULT_DB_ALIAS)
+        created = wrap is None
+        if created:
+            wrap = SpotifyWraps.objects.create(**fields, scheduled=scheduled)
+    ensure_wrap_description(wrap, get_wrap_language())
+    return wrap, created
+
+def _top_items_key(user_profile_id, time_range):
+    return f"spotify_top:{user_profile_id}:{time_range}"
+
+def fetch_top_items(access_token, time_range):
+    """
+    Fetches a user's top tracks and artists for a time range from Spotify.
+
+    Args:
+        access_token (str): The user's Spotify access token.
+        time_range (str): short_term, medium_term or long_term.
+
+    Returns:
+        tuple: The decoded top tracks and top artists responses.
+
+    Raises:
+        UpstreamError: If Spotify failed or its breaker is open.
+        UpstreamRejectedError: If Spotify rejected the request, e.g. an
+            expired or revoked token.
+    """
+    headers = {'Authorization': f'Bearer {access_token}'}
+    responses = []
+    for kind in ('tracks', 'artists'):
+        response = spotify_get(f"{SPOTIFY_API_BASE_URL}/me/top/{kind}?limit=50&time_range={time_range}", headers)
+        # Anything but a 200 would otherwise be saved as an empty wrap
+        if response.status_code != 200:
+            raise UpstreamRejectedError(f"Spotify returned {response.status_code} for top {kind}")
+        responses.append(response.json())
+    return tuple(responses)
+
+def prefetch_top_items(user_profile_id, access_token):
+    """
+    Stores a user's top tracks and artists for every time range in the cache
+    for SPOTIFY_PREFETCH_SECONDS and the artists behind the top tracks in the
+    Artist store, so their first wrap needs no Spotify calls. Runs on the
+    prefetch thread pool and gives up at the first failure.
+
+    Args:
+        user_profile_id (int): The user's profile id.
+        access_token (str): The user's Spotify access token.
+    """
+    try:
+        for time_range in TIME_RANGES.values():
+            try:
+                items = fetch_top_items(access_token, time_range)
+            except UpstreamError:
+                return
+            # Warm the Artist store too, so the wrap's genre lookup needs no call
+            get_artist_genres(access_token, get_track_artist_ids(*items))
+            cache.set(_top_items_key(user_profile_id, time_range), items, settings.SPOTIFY_PREFETCH_SECONDS)
+    finally:
+        PREFETCH_SLOTS.release()
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
+
+def start_top_items_prefetch(user_profile_id, access_token):
+    """
+    Starts prefetching a user's top items in the background without waiting
+    for it.
+
+    Args:
+        user_profile_id (int): The user's profile id.
+        access_token (str): The user's Spotify access token.
+
+    Returns:
+        bool: False if every prefetch slot was busy and nothing was started.
+    """
+    if not PREFETCH_SLOTS.acquire(blocking=False):
+        return False
+    PREFETCH_EXECUTOR.submit(prefetch_top_items, user_profile_id, access_token)
+    return True
+
+def get_track_artist_ids(tracks_data, artists_data):
+    """
+    Returns the ids of the artists behind the top tracks that are not top
+    artists themselves, whose genres come from the Artist store.
+
+    Args:
+        tracks_data (dict): The decoded top tracks response.
+        artists_data (dict): The decoded top artists response.
+
+    Returns:
+        list: Distinct Spotify artist ids, in track order.
+    """
+    known_ids = {artist.get("id") for artist in artists_data.get("items", [])}
+    return list(dict.fromkeys(
+        artist["id"]
+        for track in tracks_data.get("items", [])
+        for artist in track.get("artists", [])
+        if artist.get("id") and artist["id"] not in known_ids
+    ))
+
+def artists_from_spotify(items):
+    """
+    Builds unsaved Artist rows from Spotify artist objects.
+
+    Args:
+        items (list): Artist objects from a Spotify response; null entries are skipped.
+
+    Returns:
+        list: One Artist per distinct Spotify id.
+    """
+    now = timezone.now()
+    artists = {}
+    for item in items:
+        if item and item.get('id'):
+            artists[item['id']] = Artist(
+                spotify_id=item['id'],
+                name=item.get('name', ''),
+                genres=json.dumps(item.get('genres', [])),
+                images=json.dumps(item.get('images', [])),
+                popularity=item.get('popularity'),
+                fetched_at=now,
+            )
+    return list(artists.values())
+
+def save_artists(artists):
+    """
+    Inserts or refreshes artists in the shared store with a single query.
+    Rows are written in Spotify id order, so concurrent upserts of
+    overlapping artists lock them in the same order instead of deadlocking.
+    Call it outside long transactions: the row locks are held until commit.
+
+    Args:
+        artists (list): Artist rows built by artists_from_spotify.
+    """
+    if artists:
+        Artist.objects.bulk_create(
+            sorted(artists, key=lambda artist: artist.spotify_id),
+            update_conflicts=True,
+            unique_fields=['spotify_id'],
+            update_fields=['name', 'genres', 'images', 'popularity', 'fetched_at'],
+        )
+
+def get_artist_genres(access_token, artist_ids):
+    """
+    Returns artists' genres from the shared Artist store. Missing and stale
+    artists are refreshed with at most one batched /artists call, in the
+    given order; if Spotify is unavailable the stored data is used as is.
+
+    Args:
+        access_token (str): The user's Spotify access token.
+        artist_ids (list): Spotify artist ids, most relevant first.
+
+    Returns:
+        dict: Genre lists keyed by Spotify artist id, for the known artists.
+    """
+    if not artist_ids:
+        return {}
+    artists = {artist.spotify_id: artist for artist in Artist.objects.filter(spotify_id__in=artist_ids)}
+    stale_before = timezone.now() - timedelta(days=settings.ARTIST_METADATA_MAX_AGE_DAYS)
+    stale = [
+        artist_id for artist_id in artist_ids
+        if artist_id not in artists or artists[artist_id].fetched_at < stale_before
+    ][:ARTIST_BATCH_SIZE]
+
+    if stale:
+        headers = {'Authorization': f'Bearer {access_token}'}
+        try:
+            response = spotify_get(f"{SPOTIFY_API_BASE_URL}/artists?ids={','.join(stale)}", headers)
+        except UpstreamError:
+            response = None
+        if response is not None and response.status_code == 200:
+            fetched = artists_from_spotify(response.json().get('artists', []))
+            save_artists(fetched)
+            artists.update((artist.spotify_id, artist) for artist in fetched)
+
+    return {artist_id: json.loads(artist.genres) for artist_id, artist in artists.items()}
 
 def create_wrap_for_timeframe(user_profile, timeframe):
     """
     Creates a new Spotify wrap for a given timeframe by fetching top songs,
-    artists, and genres from the Spotify API.
+    artists, and genres from the Spotify API. The description is generated
+    in the active language now and in other languages on first view; while
+    OpenAI is unavailable the wrap is saved without one and it is generated
+    when next viewed.
 
     Args:
         user_profile (UserProfile): The user's profile.
@@ -450,32 +977,58 @@ def create_wrap_for_timeframe(user_profile, timeframe):
 
     Returns:
         SpotifyWraps: The created wrap object.
+
+    Raises:
+        UpstreamError: If Spotify failed or its breaker is open.
+        UpstreamRejectedError: If Spotify rejected the user's token.
     """
-    token = user_profile.spotify_access_token
-    headers = {'Authorization': f'Bearer {token}'}
-    time_mapping = {
-        "1 month": "short_term",
-        "1 year": "medium_term",
-        "5 years": "long_term",
-    }
-    time_range = time_mapping.get(timeframe, "short_term")
+    wrap = SpotifyWraps.objects.create(**fetch_wrap_fields(user_profile, timeframe))
+    ensure_wrap_description(wrap, get_wrap_language())
+    print(f"Created wrap: {wrap}")
+    return wrap
+
+def fetch_wrap_fields(user_profile, timeframe):
+    """
+    Fetches a user's top songs, artists and genres for a timeframe from
+    Spotify without saving a wrap.
+
+    Args:
+        user_profile (UserProfile): The user's profile.
+        timeframe (str): The time range for the wrap.
+
+    Returns:
+        dict: SpotifyWraps field values of the new wrap.
 
-    # Fetch data from Spotify API
-    base_url_tracks = "https://api.spotify.com/v1/me/top/tracks?limit=50"
-    response_tracks = requests.get(f"{base_url_tracks}&time_range={time_range}", headers=headers)
-    tracks_data = response_tracks.json()
+    Raises:
+        UpstreamError: If Spotify failed or its breaker is open.
+        UpstreamRejectedError: If Spotify rejected the user's token.
+    """
+    time_range = TIME_RANGES.get(timeframe, "short_term")
 
-    base_url_artists = "https://api.spotify.com/v1/me/top/artists?limit=50"
-    response_artists = requests.get(f"{base_url_artists}&time_range={time_range}", headers=headers)
-    artists_data = response_artists.json()
+    # Use the items prefetched at login once, otherwise fetch them from Spotify
+    key = _top_items_key(user_profile.id, time_range)
+    items = cache.get(key)
+    if items is None:
+        items = fetch_top_items(user_profile.spotify_access_token, time_range)
+    else:
+        cache.delete(key)
+    tracks_data, artists_data = items
 
     # Extract top songs, artists, and genres
     top_songs = [track.get("name", "None (Spotify was not used)") for track in tracks_data.get("items", [])[:5]]
     top_artists = [artist.get("name", "None (Spotify was not used)") for artist in artists_data.get("items", [])[:5]]
 
+    # Count genres of the top artists and of the artists behind the top
+    # tracks, the latter looked up in the shared Artist store
+    top_artist_items = artists_data.get("items", [])
+    save_artists(artists_from_spotify(top_artist_items))
+    track_artist_ids = get_track_artist_ids(tracks_data, artists_data)
+
     all_genres = []
-    for artist in artists_data.get("items", []):
+    for artist in top_artist_items:
         all_genres.extend(artist.get("genres", []))
+    for genres in get_artist_genres(user_profile.spotify_access_token, track_artist_ids).values():
+        all_genres.extend(genres)
 
     # Count occurrences of each genre
     genre_counter = collections.Counter(all_genres)
@@ -493,63 +1046,233 @@ def create_wrap_for_timeframe(user_profile, timeframe):
 
     num_distinct_artists = len(set(artist for artist in top_artists if artist != "None (Spotify was not used)"))
     num_genres = len(set(top_genres)) if top_genres[0] != "None (Spotify was not used)" else 0
-    api_key = settings.OPENAI_KEY_SECRET
-    message_template = [
+    return {
+        'user_profile': user_profile,
+        'top_songs': json.dumps(top_songs),
+        'top_artists': json.dumps(top_artists),
+        'top_genres': json.dumps(top_genres),
+        'length': timeframe,
+        'num_distinct_artists': num_distinct_artists,
+        'num_genres': num_genres,
+    }
+
+def get_wrap_language():
+    """
+    Returns the wrap description language for the active request language.
+
+    Returns:
+        str: A language code from settings.LANGUAGES, defaulting to 'en'.
+    """
+    language = (translation.get_language() or settings.LANGUAGE_CODE).split('-')[0]
+    return language if language in dict(settings.LANGUAGES) else 'en'
+
+def build_wrap_prompt(top_songs, top_artists, top_genres, num_distinct_artists, num_genres, language):
+    """
+    Builds the OpenAI chat messages describing a wrap.
+
+    Args:
+        top_songs (list): Names of the top songs.
+        top_artists (list): Names of the top artists.
+        top_genres (list): Names of the top genres.
+        num_distinct_artists (int): Number of distinct artists.
+        num_genres (int): Number of genres.
+        language (str): Language code the description should be written in.
+
+    Returns:
+        list: Chat messages for the completion request.
+    """
+    content = (
+        f"Write exactly what that person would think, act and tell exact clothing from top to bottom that they would wear like using that spotify wrapped data, in 60 words or less:\n\n"
+        f"Top Songs: {', '.join(top_songs)}\n"
+        f"Top Artists: {', '.join(top_artists)}\n"
+        f"Top Genres: {', '.join(top_genres)}\n"
+        f"Number of Distinct Artists: {num_distinct_artists}\n"
+        f"Number of Genres: {num_genres}\n"
+    )
+    if language != "en":
+        content += f" and write it in {dict(settings.LANGUAGES)[language]}."
+    return [
         {
             "role": "system",
             "content": "You are a person who knows all about this other person's spotify data"
         },
         {
             "role": "user",
-            "content": (
-                f"Write exactly what that person would think, act and tell exact clothing from top to bottom that they would wear like using that spotify wrapped data, in 60 words or less:\n\n"
-                f"Top Songs: {', '.join(top_songs)}\n"
-                f"Top Artists: {', '.join(top_artists)}\n"
-                f"Top Genres: {', '.join(top_genres)}\n"
-                f"Number of Distinct Artists: {num_distinct_artists}\n"
-                f"Number of Genres: {num_genres}\n"
-            ),
+            "content": content,
         }
     ]
 
-    client = OpenAI(api_key=api_key)
-    translations = {}
-    languages = {
-        "en": "English",
-        "az": "Azerbaijani",
-        "ru": "Russian"
-    }
+def generate_wrap_description(message, wrap, language):
+    """
+    Generates a wrap description with OpenAI and records its token usage.
 
-    for lang in languages:
-        translated_message = message_template.copy()
-        if lang != "en":
-            translated_message[-1]["content"] += f" and write it in {languages[lang]}."
+    Args:
+        message (list): Chat messages built by build_wrap_prompt.
+        wrap (SpotifyWraps): The wrap being described.
+        language (str): Language code of the description.
 
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=translated_message,
-            temperature=0.7,
-            max_tokens=100,
-        )
-        translations[lang] = response.choices[0].message.content.strip()
-    print(f"Created wrap: {translations["en"]}")
-    print(f"Created wrap: {translations["az"]}")
-    print(f"Created wrap: {translations["ru"]}")
-    # Save wrap
-    wrap = SpotifyWraps.objects.create(
-        user_profile=user_profile,
-        top_songs=json.dumps(top_songs),
-        top_artists=json.dumps(top_artists),
-        top_genres=json.dumps(top_genres),
-        length=timeframe,
-        num_distinct_artists=num_distinct_artists,
-        num_genres=num_genres,
-        LLM_description_en=translations["en"],
-        LLM_description_az=translations["az"],
-        LLM_description_ru=translations["ru"]
+    Returns:
+        str: The generated description.
+
+    Raises:
+        UpstreamError: If OpenAI failed or its breaker is open.
+    """
+    start = time.perf_counter()
+    response = openai_breaker.call(
+        get_openai_client().chat.completions.create,
+        model=WRAP_DESCRIPTION_MODEL,
+        messages=message,
+        temperature=0.7,
+        max_tokens=100,
     )
-    print(f"Created wrap: {wrap}")
-    return wrap
+    latency_ms = int((time.perf_counter() - start) * 1000)
+
+    usage = response.usage
+    LLMUsage.objects.create(
+        wrap_id=wrap.id,
+        user_profile_id=wrap.user_profile_id,
+        model=response.model or WRAP_DESCRIPTION_MODEL,
+        language=language,
+        prompt_tokens=usage.prompt_tokens if usage else 0,
+        completion_tokens=usage.completion_tokens if usage else 0,
+        latency_ms=latency_ms,
+    )
+    return response.choices[0].message.content.strip()
+
+def _stored_wrap_description(wrap, field):
+    """
+    Reads a wrap's current description from the primary database.
+
+    Args:
+        wrap (SpotifyWraps): The wrap being viewed.
+        field (str): The description field.
+
+    Returns:
+        str: The stored description, or None if there is none.
+    """
+    if wrap.archived:
+        archived = ArchivedSpotifyWraps.objects.using(DEFAULT_DB_ALIAS).filter(pk=wrap.pk).first()
+        return getattr(archived.to_wrap(), field) if archived else None
+    return SpotifyWraps.objects.using(DEFAULT_DB_ALIAS).filter(pk=wrap.pk).values_list(field, flat=True).first()
+
+def _save_wrap_description(wrap, field, description):
+    """
+    Saves a generated description unless one was saved meanwhile.
+
+    Args:
+        wrap (SpotifyWraps): The described wrap.
+        field (str): The description field.
+        description (str): The generated description.
+
+    Returns:
+        str: The description now stored.
+    """
+    if wrap.archived:
+        # The payload is one compressed blob, so it is rewritten under a
+        # short row lock; no upstream call runs while it is held
+        with transaction.atomic():
+            archived = ArchivedSpotifyWraps.objects.select_for_update().get(pk=wrap.pk)
+            stored = archived.to_wrap()
+            if not getattr(stored, field):
+                setattr(stored, field, description)
+                archived.payload = ArchivedSpotifyWraps.compress(stored)
+                archived.save(update_fields=['payload'])
+            return getattr(stored, field)
+    updated = SpotifyWraps.objects.filter(
+        Q(**{f'{field}__isnull': True}) | Q(**{field: ''}), pk=wrap.pk
+    ).update(**{field: description})
+    return description if updated else _stored_wrap_description(wrap, field)
+
+def ensure_wrap_description(wrap, language):
+    """
+    Returns the wrap's description in the given language, generating and
+    saving it on first use. A short-lived cache key lets one caller generate
+    each (wrap, language) while concurrent viewers wait for its result, and
+    no transaction is open during the OpenAI call. If OpenAI is unavailable
+    nothing is saved, so a later view generates it.
+
+    Args:
+        wrap (SpotifyWraps): The wrap being viewed.
+        language (str): Language code of the description.
+
+    Returns:
+        str: The description in the requested language, or None if it could
+            not be generated.
+    """
+    field = f'LLM_description_{language}'
+    if getattr(wrap, field):
+        return getattr(wrap, field)
+
+    claim_key = f"wrap_description:{wrap.pk}:{language}"
+    claim_seconds = settings.OPENAI_TIMEOUT_SECONDS + DESCRIPTION_CLAIM_MARGIN_SECONDS
+    if cache.add(claim_key, True, claim_seconds):
+        try:
+            description = _stored_wrap_description(wrap, field)
+            if not description:
+                description = generate_wrap_description(build_wrap_prompt(
+                    json.loads(wrap.top_songs),
+                    json.loads(wrap.top_artists),
+                    json.loads(wrap.top_genres),
+                    wrap.num_distinct_artists,
+                    wrap.num_genres,
+                    language,
+                ), wrap, language)
+                description = _save_wrap_description(wrap, field, description)
+        except UpstreamError:
+            return None
+        finally:
+            cache.delete(claim_key)
+    else:
+        # Another caller is generating it; wait for its result
+        deadline = time.monotonic() + claim_seconds
+        description = _stored_wrap_description(wrap, field)
+        while not description and cache.get(claim_key) and time.monotonic() < deadline:
+            time.sleep(DESCRIPTION_WAIT_INTERVAL_SECONDS)
+            description = _stored_wrap_description(wrap, field)
+        if not description:
+            return None
+
+    setattr(wrap, field, description)
+    return description
+
+def wrap_card(request, wrap_id):
+    """
+    Serves a shareable summary card image of a wrap, rendering it once per
+    language and theme and serving the cached file afterwards.
+
+    Args:
+        request (HttpRequest): The request object. The optional 'format'
+            query parameter selects 'png' (default) or 'webp'.
+        wrap_id (int): The wrap's id.
+
+    Returns:
+        FileResponse: The card image, or a 404 JSON error.
+    """
+    image_format = request.GET.get('format', 'png')
+    if image_format not in CARD_FORMATS:
+        return JsonResponse({"error": "Unsupported format."}, status=400)
+    try:
+        wrap = get_saved_wrap(wrap_id, request.user.userprofile)
+    except SpotifyWraps.DoesNotExist:
+        return JsonResponse({"error": "Wrap not found."}, status=404)
+
+    language = get_wrap_language()
+    theme = request.session.get('theme', 'dark')
+    card = open_wrap_card(wrap, language, theme, image_format, lambda: ensure_wrap_description(wrap, language))
+    return FileResponse(card, content_type=CARD_FORMATS[image_format][1])
+
+@staff_member_required
+def upstream_status(request):
+    """
+    Reports the state and transition counts of the upstream circuit breakers.
+
+    Args:
+        request (HttpRequest): The request object.
+
+    Returns:
+        JsonResponse: A snapshot of each breaker, keyed by upstream name.
+    """
+    return JsonResponse({breaker.name: breaker.snapshot() for breaker in BREAKERS})
 
 def delete_account(request):
     """
@@ -562,9 +1285,10 @@ def delete_account(request):
         HttpResponse: Rendered home page.
     """
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
+        user_profile = request.user.userprofile
         # Delete all wraps for the user's profile
         SpotifyWraps.objects.filter(user_profile=user_profile).delete()
+        ArchivedSpotifyWraps.objects.filter(user_profile=user_profile).delete()
 
         # Log the user out
         logout(request)
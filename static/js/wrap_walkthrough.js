@@ -0,0 +1,55 @@
+/**
+ * Wrap walkthrough navigation.
+ *
+ * Loads every slide of the wrap in one background request and switches
+ * slides in place when a Next link is clicked, keeping the address bar in
+ * sync with the History API. Until the slides have loaded, or if loading
+ * fails, the links navigate normally, so direct links keep working.
+ */
+(function () {
+    const container = document.querySelector('.wrap-slide');
+    if (!container || !container.dataset.slidesUrl || !window.fetch) {
+        return;
+    }
+
+    let slides = null;
+    fetch(container.dataset.slidesUrl, {credentials: 'same-origin'})
+        .then((response) => (response.ok ? response.json() : Promise.reject(response.status)))
+        .then((data) => {
+            slides = data.slides;
+        })
+        .catch(() => {});
+
+    /**
+     * show - Replaces the current slide with the slide of a page URL.
+     * @param {string} url - Path of the slide's page.
+     */
+    function show(url) {
+        container.innerHTML = slides[url];
+        window.scrollTo(0, 0);
+    }
+
+    container.addEventListener('click', (event) => {
+        const link = event.target.closest('a.wrap-next');
+        if (!link || event.button !== 0 || event.metaKey || event.ctrlKey || event.shiftKey || event.altKey) {
+            return;
+        }
+        const url = new URL(link.href, window.location.href).pathname;
+        if (!slides || !(url in slides)) {
+            return;
+        }
+        event.preventDefault();
+        show(url);
+        history.pushState({wrapSlide: url}, '', url);
+    });
+
+    history.replaceState({wrapSlide: window.location.pathname}, '', window.location.href);
+    window.addEventListener('popstate', (event) => {
+        const url = event.state && event.state.wrapSlide;
+        if (url && slides && url in slides) {
+            show(url);
+        } else {
+            window.location.reload();
+        }
+    });
+})();